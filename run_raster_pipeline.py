@@ -10,7 +10,6 @@ Pipeline order:
 
 from pathlib import Path
 import sys
-import yaml
 
 # Allow importing modules from src/
 ROOT = Path(__file__).parent
@@ -20,11 +19,12 @@ import raster_prep
 import flood_mask
 import ndwi_series  # NEW: analytical NDWI time-series builder
 import cube_demo
+from utils_yaml import dump_yaml, load_yaml
 
 
 def main() -> None:
     """Main entry point for running the full raster pipeline."""
-    cfg = yaml.safe_load(Path("config.yaml").read_text(encoding="utf-8"))
+    cfg = load_yaml(Path("config.yaml").read_text(encoding="utf-8"))
 
     # Module A: raster preprocessing/alignment (typically event-date related)
     a_res = raster_prep.run(cfg)
@@ -52,7 +52,7 @@ def main() -> None:
     }
 
     log_path = out_dir / "run_log.yaml"
-    log_path.write_text(yaml.safe_dump(run_log, sort_keys=False), encoding="utf-8")
+    log_path.write_text(dump_yaml(run_log), encoding="utf-8")
 
     print("\nPipeline finished.")
     print("A outputs:", a_res)
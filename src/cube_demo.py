@@ -1,9 +1,16 @@
 """
-ndwi_datacube.py
+cube_demo.py
 
 Build an NDWI time data cube (time × y × x) using xarray from multiple analytical
 NDWI GeoTIFFs, ensuring grid alignment, and compute simple temporal summaries.
 
+The summaries written by `run_datacube` are computed block by block: for every
+tile of the (tiled, deflate-compressed) output GeoTIFFs, the same window is read
+from each date into a small (time, bh, bw) buffer, which is reduced in a single
+pass (see cube_kernels.reduce_block) into per-date statistics and change/mean
+blocks written straight to the outputs. Only a few blocks per date are held in
+memory, so the cube never has to fit in RAM.
+
 This module is designed for filenames like:
     2023-09-10-00_00_2023-09-10-23_59_Sentinel-2_L2A_NDWI.tiff
 
@@ -22,22 +29,36 @@ Key outputs
 Usage
 -----
 Option A (recommended): use a small config dict in code:
-    python ndwi_datacube.py
+    python src/cube_demo.py
 
 Option B: integrate into your pipeline by importing `run_datacube(...)`.
 """
 
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from datetime import date
 from pathlib import Path
-from typing import Any, Dict, List, Tuple
+from typing import TYPE_CHECKING, Any, Dict, List, Tuple
 import re
 
 import numpy as np
-import xarray as xr
-import yaml
-
-from utils_rasterio import read_tif, write_tif, same_grid, resample_to_match
+import rasterio
+from rasterio.windows import Window
+
+from cube_kernels import reduce_block
+from ndwi_codec import NDWI_Q_NODATA, NDWI_Q_SCALE, band_scale, quantize_ndwi, unscale
+from utils_rasterio import (
+    create_tif,
+    gdal_env,
+    open_aligned,
+    tiled_gtiff_options,
+)
+from utils_yaml import dump_yaml
+
+if TYPE_CHECKING:
+    import xarray as xr
 
 # Extract the first "YYYY-MM-DD" in filename
 _DATE_RE = re.compile(r"(\d{4}-\d{2}-\d{2})")
@@ -47,6 +68,9 @@ def extract_date_str(filename: str) -> str:
     """
     Extract a date string (YYYY-MM-DD) from a filename.
 
+    Canonical Sentinel-2 filenames start with the date, so the first 10
+    characters are tried first; the regex search is only a fallback.
+
     Parameters
     ----------
     filename : str
@@ -62,6 +86,13 @@ def extract_date_str(filename: str) -> str:
     ValueError
         If no date pattern is found.
     """
+    head = filename[:10]
+    try:
+        if date.fromisoformat(head).isoformat() == head:
+            return head
+    except ValueError:
+        pass
+
     m = _DATE_RE.search(filename)
     if not m:
         raise ValueError(f"Cannot find YYYY-MM-DD in filename: {filename}")
@@ -90,7 +121,9 @@ def list_ndwi_files(ndwi_dir: Path) -> List[Path]:
     files = list(ndwi_dir.glob("*.tif")) + list(ndwi_dir.glob("*.tiff"))
     if not files:
         raise FileNotFoundError(f"No .tif/.tiff files found in: {ndwi_dir}")
-    return sorted(files, key=lambda p: extract_date_str(p.name))
+    # Decorate-sort-undecorate: parse each date once
+    keyed = sorted((extract_date_str(p.name), p) for p in files)
+    return [p for _, p in keyed]
 
 
 def nodata_to_nan(arr: np.ndarray, nodata: float | int | None) -> np.ndarray:
@@ -112,68 +145,183 @@ def nodata_to_nan(arr: np.ndarray, nodata: float | int | None) -> np.ndarray:
     out = arr.astype(np.float32, copy=False)
     if nodata is None:
         return out
-    return np.where(out == np.float32(nodata), np.nan, out)
+    is_nodata = out == np.float32(nodata)
+    if not is_nodata.any():
+        return out  # nothing to mask: no copy
+    return np.where(is_nodata, np.nan, out)
+
+
+def _load_and_align(
+    fp: Path,
+    ref_prof: dict,
+    resampling_continuous: str,
+    out: np.ndarray,
+) -> None:
+    """
+    Read one NDWI raster into `out`, aligning it to the reference grid if needed.
+
+    Parameters
+    ----------
+    fp : Path
+        NDWI GeoTIFF path.
+    ref_prof : dict
+        Reference rasterio profile.
+    resampling_continuous : str
+        Resampling method used when the grids differ.
+    out : np.ndarray
+        Preallocated float32 (height, width) array on the reference grid.
+    """
+    scale, nodata = band_scale(fp)
+    # Aligned rasters are read directly; others are warped on read through a
+    # float32 WarpedVRT straight into `out`, without a full source array
+    with open_aligned(fp, ref_prof, method=resampling_continuous, dtype="float32") as src:
+        src.read(1, out=out)
+    unscale(out, scale, nodata)
+
+
+class _LazyAlignedRaster:
+    """
+    Array-like, read-only view of one raster on the reference grid.
+
+    Slicing reads only the requested window (through open_aligned), which lets
+    dask build a chunked cube without loading the rasters up front.
+    """
+
+    def __init__(self, fp: Path, ref_prof: dict, resampling_continuous: str) -> None:
+        self.fp = fp
+        self.ref_prof = ref_prof
+        self.resampling_continuous = resampling_continuous
+        self.scale, self.nodata = band_scale(fp)
+        self.shape = (int(ref_prof["height"]), int(ref_prof["width"]))
+        self.dtype = np.dtype(np.float32)
+        self.ndim = 2
+
+    def __getitem__(self, key: Tuple[slice, slice]) -> np.ndarray:
+        rows, cols = key
+        r0, r1, _ = rows.indices(self.shape[0])
+        c0, c1, _ = cols.indices(self.shape[1])
+        if r1 <= r0 or c1 <= c0:
+            return np.empty((max(r1 - r0, 0), max(c1 - c0, 0)), dtype=np.float32)
+        window = Window(c0, r0, c1 - c0, r1 - r0)
+        with open_aligned(self.fp, self.ref_prof, method=self.resampling_continuous) as src:
+            arr = src.read(1, window=window).astype(np.float32, copy=False)
+        unscale(arr, self.scale, self.nodata)
+        return arr
+
+
+# Pixel-center coordinate vectors, keyed on (width, height, transform coefficients)
+_COORDS_CACHE: Dict[Tuple, Tuple[np.ndarray, np.ndarray]] = {}
+
+
+def _pixel_center_coords(transform: Any, width: int, height: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Pixel-center x/y coordinate vectors for a north-up grid (cached per grid).
+
+    The returned arrays are read-only because they are shared between calls.
+    """
+    a, _, c, _, e, f = tuple(transform)[:6]
+    key = (width, height, a, c, e, f)
+    coords = _COORDS_CACHE.get(key)
+    if coords is None:
+        x = np.linspace(c + a * 0.5, c + a * (width - 0.5), width)
+        y = np.linspace(f + e * 0.5, f + e * (height - 0.5), height)  # e is usually negative
+        x.flags.writeable = False
+        y.flags.writeable = False
+        coords = _COORDS_CACHE[key] = (x, y)
+    return coords
 
 
 def build_time_cube(
     files: List[Path],
     *,
     resampling_continuous: str = "bilinear",
+    chunks: int | None = None,
+    quantize: bool = False,
 ) -> Tuple[xr.DataArray, dict, List[str]]:
     """
     Read multiple NDWI rasters, align them to a common grid, and stack into an xarray cube.
 
+    By default the full cube is materialized in memory; files are read and aligned
+    concurrently in a thread pool (GDAL releases the GIL during I/O and warping).
+    With `chunks`, the cube is instead backed by a lazy dask array whose
+    (1, chunks, chunks) blocks are read on demand, so xarray reductions such as
+    `da.mean(dim="time")` run block-wise and the cube may exceed RAM.
+    `run_datacube` does not need this: it streams the rasters block by block.
+
+    With `quantize`, the cube is stored as int16 (see `quantize_ndwi`), halving
+    its memory footprint and the bytes touched by temporal reductions. The
+    DataArray then carries CF `scale_factor`/`_FillValue` attributes; multiply by
+    `NDWI_Q_SCALE` (ignoring `NDWI_Q_NODATA`) to get NDWI back.
+
     Parameters
     ----------
     files : List[Path]
         NDWI GeoTIFF paths (multiple dates).
     resampling_continuous : str, optional
         Resampling method for continuous rasters (default: "bilinear").
+    chunks : int | None, optional
+        Spatial chunk size (pixels) for a lazy dask-backed cube (default: None,
+        i.e. load everything into memory). Requires dask.
+    quantize : bool, optional
+        Store the cube as int16 with a 1e-4 step (default: False, i.e. float32).
 
     Returns
     -------
     Tuple[xr.DataArray, dict, List[str]]
         (xarray DataArray with dims (time,y,x), reference profile, list of date strings)
+
+    Raises
+    ------
+    RuntimeError
+        If `chunks` is given but dask is not available.
     """
+    # xarray (and dask) are only needed here; keep them out of the module import
+    import xarray as xr
+
     # Use the first raster as the reference grid
-    ref_arr, ref_prof = read_tif(files[0])
+    with rasterio.open(files[0]) as ref_src:
+        ref_prof = ref_src.profile.copy()
     ref_nodata = ref_prof.get("nodata", None)
 
-    dates: List[str] = []
-    stack: List[np.ndarray] = []
-
-    for i, fp in enumerate(files):
-        date_str = extract_date_str(fp.name)
-        arr, prof = read_tif(fp)
-
-        # Align current raster to reference grid if needed
-        if i == 0:
-            aligned = arr
-        else:
-            if same_grid(ref_prof, prof):
-                aligned = arr
-            else:
-                aligned = resample_to_match(
-                    src_arr=arr,
-                    src_profile=prof,
-                    dst_profile=ref_prof,
-                    method=resampling_continuous,
-                    out_dtype=np.float32,
-                )
-
-        dates.append(date_str)
-        stack.append(aligned.astype(np.float32, copy=False))
-
-    data = np.stack(stack, axis=0)  # (time, y, x)
-
-    # Build x/y coordinates from the reference affine transform
-    tr = ref_prof["transform"]
-    height = ref_prof["height"]
-    width = ref_prof["width"]
-
-    # Pixel center coordinates
-    x = tr.c + tr.a * (np.arange(width) + 0.5)
-    y = tr.f + tr.e * (np.arange(height) + 0.5)  # tr.e is usually negative
+    dates = [extract_date_str(fp.name) for fp in files]
+
+    if chunks is not None:
+        try:
+            import dask.array as dsa
+        except Exception:
+            raise RuntimeError("Dask is not available. Install dask to build a lazy cube.") from None
+        lazy = [
+            dsa.from_array(
+                _LazyAlignedRaster(fp, ref_prof, resampling_continuous),
+                chunks=(chunks, chunks),
+                meta=np.empty((0, 0), dtype=np.float32),
+            )
+            for fp in files
+        ]
+        data = dsa.stack(lazy, axis=0)  # (time, y, x), lazy
+        if quantize:
+            data = data.map_blocks(
+                quantize_ndwi, ref_nodata, dtype=np.int16, meta=np.empty((0, 0, 0), np.int16)
+            )
+    else:
+        shape = (int(ref_prof["height"]), int(ref_prof["width"]))
+        data = np.empty(
+            (len(files), *shape), dtype=np.int16 if quantize else np.float32
+        )  # (time, y, x)
+
+        def _fill(i: int) -> None:
+            if not quantize:
+                _load_and_align(files[i], ref_prof, resampling_continuous, data[i])
+                return
+            tmp = np.empty(shape, dtype=np.float32)
+            _load_and_align(files[i], ref_prof, resampling_continuous, tmp)
+            quantize_ndwi(tmp, ref_nodata, out=data[i])
+
+        # Read + align all dates concurrently, each straight into its slice of the cube
+        with gdal_env(), ThreadPoolExecutor(max_workers=min(len(files), 8)) as ex:
+            list(ex.map(_fill, range(len(files))))
+
+    x, y = _pixel_center_coords(ref_prof["transform"], int(ref_prof["width"]), int(ref_prof["height"]))
 
     da = xr.DataArray(
         data,
@@ -182,6 +330,8 @@ def build_time_cube(
         name="NDWI",
         attrs={"crs": str(ref_prof.get("crs", "")), "nodata": ref_nodata},
     )
+    if quantize:
+        da.attrs.update(nodata=NDWI_Q_NODATA, scale_factor=NDWI_Q_SCALE, _FillValue=NDWI_Q_NODATA)
     return da, ref_prof, dates
 
 
@@ -219,35 +369,87 @@ def run_datacube(
     out_dir.mkdir(parents=True, exist_ok=True)
 
     files = list_ndwi_files(ndwi_dir)
-    da, ref_prof, dates = build_time_cube(files, resampling_continuous=resampling_continuous)
+    dates = [extract_date_str(p.name) for p in files]
+
+    # Use the first raster as the reference grid
+    with rasterio.open(files[0]) as ref_src:
+        ref_prof = ref_src.profile.copy()
 
     ref_nodata = ref_prof.get("nodata", None)
     thr = float(threshold)
 
-    # Per-date global statistics (aggregate over y,x)
-    stats: Dict[str, Any] = {}
-    for t in dates:
-        arr_t = da.sel(time=t).values  # (y,x)
-        valid = nodata_to_nan(arr_t, ref_nodata)
-
-        flooded_ratio = float(np.nanmean((valid > thr).astype(np.float32)))
-        stats[t] = {
-            "mean": float(np.nanmean(valid)),
-            "min": float(np.nanmin(valid)),
-            "max": float(np.nanmax(valid)),
-            "flooded_ratio_ndwi_gt_thr": flooded_ratio,
-        }
+    # Running per-date accumulators (aggregate over y,x)
+    n_dates = len(files)
+    sums = np.zeros(n_dates, dtype=np.float64)
+    counts = np.zeros(n_dates, dtype=np.int64)
+    mins = np.full(n_dates, np.inf, dtype=np.float64)
+    maxs = np.full(n_dates, -np.inf, dtype=np.float64)
+    gt_thr = np.zeros(n_dates, dtype=np.int64)
 
-    # Pixel-wise temporal summaries
-    change = (da.isel(time=-1) - da.isel(time=0)).values.astype(np.float32)
-    mean_img = da.mean(dim="time", skipna=True).values.astype(np.float32)
+    # Band scales of int16-quantized inputs, applied to every block read
+    scales = [band_scale(fp) for fp in files]
 
-    # Write GeoTIFF outputs (use a consistent nodata value)
     change_path = out_dir / "ndwi_change_last_minus_first.tif"
     mean_path = out_dir / "ndwi_time_mean.tif"
 
-    write_tif(change_path, change, ref_prof, dtype="float32", nodata=out_nodata)
-    write_tif(mean_path, mean_img, ref_prof, dtype="float32", nodata=out_nodata)
+    with ExitStack() as stack:
+        stack.enter_context(gdal_env())
+        # One reader thread per date; each dataset is only used by one thread at a time
+        pool = stack.enter_context(ThreadPoolExecutor(max_workers=min(n_dates, 8)))
+        srcs = [
+            stack.enter_context(open_aligned(fp, ref_prof, method=resampling_continuous))
+            for fp in files
+        ]
+        # Write tiled GeoTIFF outputs (use a consistent nodata value)
+        gtiff_opts = tiled_gtiff_options("float32")
+        change_dst = stack.enter_context(
+            create_tif(change_path, ref_prof, dtype="float32", nodata=out_nodata, **gtiff_opts)
+        )
+        mean_dst = stack.enter_context(
+            create_tif(mean_path, ref_prof, dtype="float32", nodata=out_nodata, **gtiff_opts)
+        )
+
+        # One buffer sized for the largest tile, reused for every block
+        # (edge tiles use a contiguous view of its head)
+        windows = [w for _, w in change_dst.block_windows(1)]
+        buf = np.empty(n_dates * max(w.height * w.width for w in windows), dtype=np.float32)
+
+        # Iterate the output tiles so every block is written exactly once
+        for window in windows:
+            block = buf[: n_dates * window.height * window.width].reshape(
+                n_dates, window.height, window.width
+            )
+
+            def _read(i: int) -> None:
+                srcs[i].read(1, window=window, out=block[i])
+                unscale(block[i], scales[i][0], scales[i][1])
+
+            list(pool.map(_read, range(n_dates)))
+
+            # Single pass: per-date statistics + pixel-wise change and mean
+            b_sums, b_counts, b_mins, b_maxs, b_gt, change_block, mean_block = reduce_block(
+                block, ref_nodata, thr
+            )
+            sums += b_sums
+            counts += b_counts
+            np.minimum(mins, b_mins, out=mins)
+            np.maximum(maxs, b_maxs, out=maxs)
+            gt_thr += b_gt
+
+            change_dst.write(change_block, 1, window=window)
+            mean_dst.write(mean_block, 1, window=window)
+
+    # Flooded ratio is relative to all pixels of the grid (nodata counts as not flooded)
+    n_pixels = int(ref_prof["width"]) * int(ref_prof["height"])
+    stats: Dict[str, Any] = {}
+    for i, t in enumerate(dates):
+        has_data = counts[i] > 0
+        stats[t] = {
+            "mean": float(sums[i] / counts[i]) if has_data else float("nan"),
+            "min": float(mins[i]) if has_data else float("nan"),
+            "max": float(maxs[i]) if has_data else float("nan"),
+            "flooded_ratio_ndwi_gt_thr": float(gt_thr[i] / n_pixels),
+        }
 
     # Write YAML summary
     stats_path = out_dir / "cube_stats.yaml"
@@ -267,26 +469,27 @@ def run_datacube(
             "ndwi_time_mean": str(mean_path),
         },
     }
-    stats_path.write_text(yaml.safe_dump(result, sort_keys=False), encoding="utf-8")
+    stats_path.write_text(dump_yaml(result), encoding="utf-8")
     return result
 
 
-def main() -> None:
+def run(cfg: Dict[str, Any]) -> Dict[str, Any]:
     """
-    CLI entry point.
+    Entry point used by the global pipeline (run_raster_pipeline.py).
 
-    Edit paths here if your project uses different folders.
-    """
-    res = run_datacube(
-        ndwi_time_dir="raster_data/ndwi_time",
-        output_dir="data/output",
-        threshold=0.1,
-        resampling_continuous="bilinear",
-    )
-    print("[Datacube] cube_stats:", res["cube_stats"])
-    print("[Datacube] outputs:", res["outputs"])
+    Parameters
+    ----------
+    cfg : Dict[str, Any]
+        Parsed config.yaml. Optional keys:
+          cfg["paths"]["ndwi_time_dir"] (default "raster_data/ndwi_time")
+          cfg["paths"]["output_dir"] (default "data/output")
+          cfg["cube"]["threshold"] (default 0.1)
 
-def run(cfg: dict):
+    Returns
+    -------
+    Dict[str, Any]
+        Result dictionary from `run_datacube`.
+    """
     paths = cfg.get("paths", {})
     ndwi_dir = paths.get("ndwi_time_dir", "raster_data/ndwi_time")
     out_dir = paths.get("output_dir", "data/output")
@@ -301,5 +504,21 @@ def run(cfg: dict):
     )
 
 
+def main() -> None:
+    """
+    CLI entry point.
+
+    Edit paths here if your project uses different folders.
+    """
+    res = run_datacube(
+        ndwi_time_dir="raster_data/ndwi_time",
+        output_dir="data/output",
+        threshold=0.1,
+        resampling_continuous="bilinear",
+    )
+    print("[Datacube] cube_stats:", res["cube_stats"])
+    print("[Datacube] outputs:", res["outputs"])
+
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,159 @@
+"""
+cube_kernels.py
+
+Single-pass reduction kernel for NDWI datacube blocks (used by cube_demo).
+
+`reduce_block` walks a (time, y, x) block once and returns, for that block:
+- per-date sum/count/min/max of valid pixels and the count of pixels above
+  the NDWI threshold,
+- the pixel-wise change (last date minus first date),
+- the pixel-wise temporal mean (NaN pixels skipped).
+
+If Numba is installed the kernel is JIT-compiled and parallelized over rows;
+otherwise an equivalent vectorized NumPy implementation is used (with
+Bottleneck's C `nanmean` for the temporal mean when it is installed).
+"""
+
+from __future__ import annotations
+
+from typing import Tuple
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+except Exception:
+    njit = None
+    prange = range
+
+try:
+    import bottleneck as bn
+except Exception:
+    bn = None
+
+
+def _reduce_rows(
+    block: np.ndarray,
+    nodata: float,
+    thr: float,
+    row_sums: np.ndarray,
+    row_counts: np.ndarray,
+    row_mins: np.ndarray,
+    row_maxs: np.ndarray,
+    row_gt: np.ndarray,
+    change: np.ndarray,
+    mean_img: np.ndarray,
+) -> None:
+    """
+    Kernel body: one pass over (time, y, x) with per-row partial accumulators.
+
+    Each row y owns row_*[y, :], so rows can be processed in parallel without
+    atomics; the caller reduces the partials over axis 0.
+    """
+    n_dates, height, width = block.shape
+    for y in prange(height):
+        for x in range(width):
+            change[y, x] = block[n_dates - 1, y, x] - block[0, y, x]
+            s = 0.0
+            c = 0
+            for t in range(n_dates):
+                v = block[t, y, x]
+                if np.isnan(v):
+                    continue
+                s += v
+                c += 1
+                if v == nodata:
+                    continue
+                row_sums[y, t] += v
+                row_counts[y, t] += 1
+                if v < row_mins[y, t]:
+                    row_mins[y, t] = v
+                if v > row_maxs[y, t]:
+                    row_maxs[y, t] = v
+                if v > thr:
+                    row_gt[y, t] += 1
+            mean_img[y, x] = s / c if c > 0 else np.nan
+
+
+if njit is not None:
+    _reduce_rows_jit = njit(parallel=True, cache=True)(_reduce_rows)
+else:
+    _reduce_rows_jit = None
+
+
+def _reduce_block_numpy(
+    block: np.ndarray,
+    nodata: float,
+    thr: float,
+) -> Tuple[np.ndarray, ...]:
+    """Vectorized NumPy equivalent of the Numba kernel."""
+    # One boolean validity mask shared by all reductions (no NaN-filled copy)
+    finite = ~np.isnan(block)
+    valid = finite & (block != np.float32(nodata))
+    sums = np.sum(block, axis=(1, 2), dtype=np.float64, where=valid)
+    counts = np.count_nonzero(valid, axis=(1, 2)).astype(np.int64)
+    mins = np.min(block, axis=(1, 2), initial=np.inf, where=valid).astype(np.float64)
+    maxs = np.max(block, axis=(1, 2), initial=-np.inf, where=valid).astype(np.float64)
+    gt = np.count_nonzero((block > thr) & valid, axis=(1, 2)).astype(np.int64)
+
+    change = block[-1] - block[0]
+    if bn is not None:
+        # NaN-skipping mean in C; all-NaN pixels give NaN without a warning
+        mean_img = bn.nanmean(block, axis=0)
+    else:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean_img = np.sum(block, axis=0, where=finite) / finite.sum(axis=0)
+    return sums, counts, mins, maxs, gt, change, mean_img.astype(np.float32, copy=False)
+
+
+def reduce_block(
+    block: np.ndarray,
+    nodata: float | int | None,
+    thr: float,
+) -> Tuple[np.ndarray, ...]:
+    """
+    Reduce a (time, y, x) NDWI block in a single pass.
+
+    Parameters
+    ----------
+    block : np.ndarray
+        Float32 block with dims (time, y, x).
+    nodata : float | int | None
+        Nodata value excluded from the per-date statistics (NaN is always excluded).
+    thr : float
+        NDWI threshold for the above-threshold counts.
+
+    Returns
+    -------
+    Tuple[np.ndarray, ...]
+        (sums, counts, mins, maxs, gt_thr, change, mean_img) where the first five
+        are per-date arrays of length time, and change/mean_img are float32 (y, x).
+        Dates without valid pixels have min=+inf and max=-inf.
+    """
+    nodata_f = np.nan if nodata is None else float(nodata)
+    if _reduce_rows_jit is None:
+        return _reduce_block_numpy(block, nodata_f, thr)
+
+    block = np.ascontiguousarray(block, dtype=np.float32)
+    n_dates, height, width = block.shape
+    row_sums = np.zeros((height, n_dates), dtype=np.float64)
+    row_counts = np.zeros((height, n_dates), dtype=np.int64)
+    row_mins = np.full((height, n_dates), np.inf, dtype=np.float64)
+    row_maxs = np.full((height, n_dates), -np.inf, dtype=np.float64)
+    row_gt = np.zeros((height, n_dates), dtype=np.int64)
+    change = np.empty((height, width), dtype=np.float32)
+    mean_img = np.empty((height, width), dtype=np.float32)
+
+    _reduce_rows_jit(
+        block, np.float32(nodata_f), np.float32(thr),
+        row_sums, row_counts, row_mins, row_maxs, row_gt, change, mean_img,
+    )
+    return (
+        row_sums.sum(axis=0),
+        row_counts.sum(axis=0),
+        row_mins.min(axis=0),
+        row_maxs.max(axis=0),
+        row_gt.sum(axis=0),
+        change,
+        mean_img,
+    )
@@ -80,6 +80,19 @@ BUILDINGS_ADMIN = VECTOR_OUT_DIR / "buildings_admin.gpkg"
 ADMIN_OUT = VECTOR_OUT_DIR / "admin_units_adm3.gpkg"
 """Processed administrative boundaries (ADM level 3)."""
 
+BUILDINGS_ADMIN_PARQUET = VECTOR_OUT_DIR / "buildings_admin.parquet"
+"""GeoParquet copy of BUILDINGS_ADMIN, read by Stage D when available."""
+
+ADMIN_CACHE = VECTOR_OUT_DIR / f"{ADMIN_GPKG.stem}_{ADMIN_LAYER}.fgb"
+"""
+FlatGeobuf copy of the ADMIN_LAYER of ADMIN_GPKG, with its packed R-tree.
+
+Named after both the geopackage and the layer, so changing either never
+serves a stale copy. Written by Stage C and rebuilt only when ADMIN_GPKG
+is newer, so later runs read administrative units through the embedded
+index instead of querying the multi-layer GADM geopackage.
+"""
+
 QC_VECTOR = REPORTS_DIR / "qc_vector_prep.txt"
 """Quality control report for vector preparation stage."""
 
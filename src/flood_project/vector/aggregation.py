@@ -7,6 +7,8 @@ for mapping and reporting.
 """
 
 import geopandas as gpd
+import numpy as np
+import pandas as pd
 
 
 def aggregate_by_admin(
@@ -44,9 +46,10 @@ def aggregate_by_admin(
     # -----------------------------------------------------------------
     # Aggregate building statistics by administrative unit
     # -----------------------------------------------------------------
+    # Group a plain two-column DataFrame: the geometry column is not needed
     stats = (
-        buildings
-        .groupby(admin_id_field)
+        pd.DataFrame(buildings[[admin_id_field, "flooded"]])
+        .groupby(admin_id_field, sort=False, observed=True)
         .agg(
             total_buildings=("flooded", "count"),
             flooded_buildings=("flooded", "sum"),
@@ -54,13 +57,6 @@ def aggregate_by_admin(
         .reset_index()
     )
 
-    # -----------------------------------------------------------------
-    # Calculate flooded ratio
-    # -----------------------------------------------------------------
-    stats["flooded_ratio"] = (
-        stats["flooded_buildings"] / stats["total_buildings"]
-    )
-
     # -----------------------------------------------------------------
     # Join statistics back to administrative geometries
     # -----------------------------------------------------------------
@@ -73,9 +69,17 @@ def aggregate_by_admin(
     # -----------------------------------------------------------------
     # Handle administrative units without buildings
     # -----------------------------------------------------------------
-    admin[["total_buildings", "flooded_buildings", "flooded_ratio"]] = (
-        admin[["total_buildings", "flooded_buildings", "flooded_ratio"]]
+    admin[["total_buildings", "flooded_buildings"]] = (
+        admin[["total_buildings", "flooded_buildings"]]
         .fillna(0)
     )
 
-    return admin
\ No newline at end of file
+    # -----------------------------------------------------------------
+    # Calculate flooded ratio (0 where an admin unit has no buildings)
+    # -----------------------------------------------------------------
+    total = admin["total_buildings"].to_numpy()
+    ratio = np.zeros(len(admin), dtype=np.float32)
+    np.divide(admin["flooded_buildings"].to_numpy(), total, out=ratio, where=total > 0)
+    admin["flooded_ratio"] = ratio
+
+    return admin
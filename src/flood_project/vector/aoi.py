@@ -9,17 +9,24 @@ polygon geometry.
 from pathlib import Path
 import geopandas as gpd
 import rasterio
+from rasterio.warp import transform_bounds
 from shapely.geometry import box
 
 
-def aoi_from_raster(raster_path: Path) -> gpd.GeoDataFrame:
+def aoi_from_raster(raster_path: Path, target_crs=None) -> gpd.GeoDataFrame:
     """
     Create a vector AOI from the spatial extent of a raster.
 
+    If a target CRS is given, the raster bounds are reprojected directly
+    (with densified edges) and the AOI is the bounding box of the result,
+    so it fully covers the raster extent in the target CRS.
+
     Parameters
     ----------
     raster_path : pathlib.Path
         Path to the raster file.
+    target_crs : pyproj CRS, EPSG code, or string, optional
+        CRS of the returned AOI. Defaults to the raster CRS.
 
     Returns
     -------
@@ -37,7 +44,11 @@ def aoi_from_raster(raster_path: Path) -> gpd.GeoDataFrame:
             "A valid CRS is required to derive the AOI."
         )
 
-    aoi_geom = box(bounds.left, bounds.bottom, bounds.right, bounds.top)
+    if target_crs is not None:
+        bounds = transform_bounds(crs, target_crs, *bounds, densify_pts=21)
+        crs = target_crs
+
+    aoi_geom = box(*bounds)
 
     return gpd.GeoDataFrame(
         {"geometry": [aoi_geom]},
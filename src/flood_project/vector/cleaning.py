@@ -7,6 +7,8 @@ before spatial operations such as clipping or spatial joins are applied.
 """
 
 import geopandas as gpd
+import pandas as pd
+import shapely
 
 
 # ---------------------------------------------------------------------
@@ -15,10 +17,12 @@ import geopandas as gpd
 
 def fix_invalid_geometries(gdf: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
     """
-    Detect and fix invalid geometries using a Shapely buffer-based approach.
+    Detect and fix invalid geometries using Shapely's make_valid.
 
-    Invalid geometries are repaired by applying a zero-width buffer,
-    which resolves common issues such as self-intersections.
+    Only invalid geometries are repaired; valid ones are left untouched.
+    The "structure" method rebuilds polygon rings and drops collapsed parts,
+    so polygons stay polygonal (as with the classic zero-width buffer trick)
+    while resolving common issues such as self-intersections.
 
     Parameters
     ----------
@@ -30,8 +34,17 @@ def fix_invalid_geometries(gdf: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
     geopandas.GeoDataFrame
         GeoDataFrame with corrected geometries.
     """
-    gdf = gdf.copy()
-    gdf["geometry"] = gdf.geometry.buffer(0)
+    # Shallow copy: only the geometry column is replaced, other columns are shared
+    gdf = gdf.copy(deep=False)
+
+    geoms = gdf.geometry.values
+    invalid = ~shapely.is_valid(geoms) & ~shapely.is_missing(geoms)
+    if invalid.any():
+        fixed = geoms.copy()
+        fixed[invalid] = shapely.make_valid(
+            geoms[invalid], method="structure", keep_collapsed=False
+        )
+        gdf[gdf.geometry.name] = fixed
     return gdf
 
 
@@ -59,8 +72,9 @@ def drop_duplicate_geometries(gdf: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
     """
     Remove duplicated geometries from a GeoDataFrame.
 
-    Duplicate detection is based on the WKT (well-known text) representation of geometries,
-    which is derived from Shapely geometry objects.
+    Duplicate detection is based on the WKB (well-known binary) representation
+    of geometries, serialized for all rows at once by Shapely. Only the first
+    occurrence of each geometry is kept.
 
     Parameters
     ----------
@@ -71,8 +85,6 @@ def drop_duplicate_geometries(gdf: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
     geopandas.GeoDataFrame
         GeoDataFrame with duplicate geometries removed.
     """
-    gdf = gdf.copy()
-    gdf["_geom_wkt"] = gdf.geometry.apply(lambda geom: geom.wkt)
-    gdf = gdf.drop_duplicates(subset="_geom_wkt")
-    gdf = gdf.drop(columns="_geom_wkt")
-    return gdf
\ No newline at end of file
+    wkb = shapely.to_wkb(gdf.geometry.values)
+    keep = ~pd.Series(wkb).duplicated().to_numpy()
+    return gdf.iloc[keep].copy()
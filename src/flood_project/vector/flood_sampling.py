@@ -7,21 +7,198 @@ The resulting per-building flood indicators can later be aggregated
 by administrative unit.
 """
 
+from __future__ import annotations
+
+import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import geopandas as gpd
 import rasterio
 import numpy as np
+import shapely
+from rasterio.windows import Window
 
 
 # ---------------------------------------------------------------------
 # Raster sampling at building centroids
 # ---------------------------------------------------------------------
 
+def centroid_xy(geometries: gpd.GeoSeries) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Return the x and y coordinates of geometry centroids as NumPy arrays.
+
+    Parameters
+    ----------
+    geometries : geopandas.GeoSeries
+        Input geometries.
+
+    Returns
+    -------
+    tuple of numpy.ndarray
+        (xs, ys), one value per geometry (NaN for empty geometries).
+    """
+    centroids = np.asarray(geometries.centroid.values)
+    xs = np.full(len(centroids), np.nan)
+    ys = np.full(len(centroids), np.nan)
+    # GEOS refuses get_x/get_y on empty points, so only query non-empty ones
+    has_xy = ~shapely.is_empty(centroids)
+    xs[has_xy] = shapely.get_x(centroids[has_xy])
+    ys[has_xy] = shapely.get_y(centroids[has_xy])
+    return xs, ys
+
+
+def pixel_indices(
+    transform: rasterio.Affine,
+    shape: tuple[int, int],
+    xs: np.ndarray,
+    ys: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Convert map coordinates to raster row/column indices.
+
+    Parameters
+    ----------
+    transform : affine.Affine
+        Raster geotransform.
+    shape : tuple of int
+        Raster shape (height, width).
+    xs, ys : numpy.ndarray
+        Point coordinates in the raster CRS.
+
+    Returns
+    -------
+    tuple of numpy.ndarray
+        (rows, cols, inside): integer indices for every point and a boolean
+        mask of points that fall on the raster grid. Indices of points
+        outside the grid are set to 0 and must be ignored.
+    """
+    xs = np.asarray(xs, dtype=float)
+    ys = np.asarray(ys, dtype=float)
+    rows = np.zeros(xs.shape, dtype=np.int64)
+    cols = np.zeros(xs.shape, dtype=np.int64)
+
+    finite = np.isfinite(xs) & np.isfinite(ys)
+    r, c = rasterio.transform.rowcol(transform, xs[finite], ys[finite])
+    rows[finite] = r
+    cols[finite] = c
+
+    height, width = shape
+    inside = finite & (rows >= 0) & (cols >= 0) & (rows < height) & (cols < width)
+    rows[~inside] = 0
+    cols[~inside] = 0
+    return rows, cols, inside
+
+
+def _read_block_runs(
+    src: rasterio.io.DatasetReader,
+    rows: np.ndarray,
+    cols: np.ndarray,
+    idx: np.ndarray,
+    block_id: np.ndarray,
+    runs: list[tuple[int, int]],
+    values: np.ndarray,
+) -> None:
+    """Read each run of points sharing a block and scatter them into ``values``."""
+    block_h, block_w = src.block_shapes[0]
+    n_block_cols = -(-src.width // block_w)
+    for start, end in runs:
+        row_off = int(block_id[start] // n_block_cols) * block_h
+        col_off = int(block_id[start] % n_block_cols) * block_w
+        window = Window(
+            col_off,
+            row_off,
+            min(block_w, src.width - col_off),
+            min(block_h, src.height - row_off),
+        )
+        block = src.read(1, window=window)
+        pts = idx[start:end]
+        values[pts] = block[rows[pts] - row_off, cols[pts] - col_off]
+
+
+def read_pixels(
+    src: rasterio.io.DatasetReader,
+    rows: np.ndarray,
+    cols: np.ndarray,
+    inside: np.ndarray,
+    fill: float | int = 0,
+    max_workers: int | None = 1,
+) -> np.ndarray:
+    """
+    Read band 1 values at given pixels, touching only the blocks that hold them.
+
+    Points are grouped by the raster's internal block (tile or strip) and
+    each touched block is read once with a windowed read, so memory stays
+    bounded by the block size rather than the full raster.
+
+    With several workers, the touched blocks are split into contiguous
+    chunks and each chunk is read by its own thread through its own
+    dataset handle (GDAL handles must not be shared between threads).
+
+    Parameters
+    ----------
+    src : rasterio.io.DatasetReader
+        Open raster dataset.
+    rows, cols : numpy.ndarray
+        Pixel indices, as returned by :func:`pixel_indices`.
+    inside : numpy.ndarray
+        Boolean mask of indices that fall on the raster grid.
+    fill : float or int, default 0
+        Value returned for points outside the grid.
+    max_workers : int, optional
+        Number of reader threads. ``None`` picks one per CPU (at most 8);
+        the default of 1 reads everything through ``src``.
+
+    Returns
+    -------
+    numpy.ndarray
+        One value per point, in the band's data type.
+    """
+    values = np.full(rows.shape, fill, dtype=src.dtypes[0])
+
+    idx = np.flatnonzero(inside)
+    if idx.size == 0:
+        return values
+
+    block_h, block_w = src.block_shapes[0]
+    n_block_cols = -(-src.width // block_w)
+    block_id = (rows[idx] // block_h) * n_block_cols + cols[idx] // block_w
+
+    # Sort points by block and walk each run of points sharing a block
+    order = np.argsort(block_id, kind="stable")
+    idx, block_id = idx[order], block_id[order]
+    starts = np.flatnonzero(np.r_[True, block_id[1:] != block_id[:-1]])
+    ends = np.r_[starts[1:], idx.size]
+    runs = list(zip(starts.tolist(), ends.tolist()))
+
+    if max_workers is None:
+        max_workers = min(os.cpu_count() or 1, 8)
+    max_workers = min(max_workers, len(runs))
+
+    if max_workers <= 1:
+        _read_block_runs(src, rows, cols, idx, block_id, runs, values)
+        return values
+
+    def _read_chunk(chunk: list[tuple[int, int]]) -> None:
+        # Each worker writes a disjoint set of points into ``values``
+        with rasterio.open(src.name) as worker_src:
+            _read_block_runs(worker_src, rows, cols, idx, block_id, chunk, values)
+
+    bounds = np.linspace(0, len(runs), max_workers + 1).astype(int)
+    chunks = [runs[lo:hi] for lo, hi in zip(bounds[:-1], bounds[1:])]
+    with ThreadPoolExecutor(max_workers=max_workers) as ex:
+        list(ex.map(_read_chunk, chunks))
+
+    return values
+
+
 def sample_raster_at_centroids(
     buildings: gpd.GeoDataFrame,
     raster_path: Path,
     value_field: str = "flood_value",
+    raster_data: np.ndarray | None = None,
+    max_workers: int | None = None,
+    xy: tuple[np.ndarray, np.ndarray] | None = None,
 ) -> gpd.GeoDataFrame:
     """
     Sample a raster flood mask at building centroid locations.
@@ -30,6 +207,10 @@ def sample_raster_at_centroids(
     to extract the raster value at that location. The sampled raster
     value is stored in a new column.
 
+    Only the raster blocks under the centroids are read (see
+    :func:`read_pixels`), instead of one GDAL read per point or the
+    whole band.
+
     Parameters
     ----------
     buildings : geopandas.GeoDataFrame
@@ -38,30 +219,41 @@ def sample_raster_at_centroids(
         Path to the raster flood mask (e.g. flood_mask_filtered.tif).
     value_field : str, default "flood_value"
         Name of the column used to store the sampled raster values.
+    raster_data : numpy.ndarray, optional
+        First band of ``raster_path`` if it has already been read; the file
+        is then only opened for its metadata.
+    max_workers : int, optional
+        Number of threads reading raster blocks (see :func:`read_pixels`).
+        ``None`` picks one per CPU, at most 8.
+    xy : tuple of numpy.ndarray, optional
+        Centroid coordinates of ``buildings`` if already computed, as
+        returned by :func:`centroid_xy`.
 
     Returns
     -------
     geopandas.GeoDataFrame
         Buildings GeoDataFrame with an additional column containing
-        the raster value sampled at each building centroid.
+        the raster value sampled at each building centroid, in the
+        raster's own data type (uint8 for the flood masks). Centroids
+        outside the raster get the raster nodata value (0 if unset).
 
     Raises
     ------
     ValueError
         If the CRS of the raster and the buildings do not match.
     """
-    # Create a copy to avoid modifying the input GeoDataFrame in place
-    gdf = buildings.copy()
+    # Shallow copy: the input frame is left untouched, its columns are shared
+    gdf = buildings.copy(deep=False)
 
     # -----------------------------------------------------------------
     # Compute building centroids
     # -----------------------------------------------------------------
     # Centroids are used only for sampling and do not replace
     # the original building geometries.
-    centroids = gdf.geometry.centroid
+    xs, ys = centroid_xy(gdf.geometry) if xy is None else xy
 
     # -----------------------------------------------------------------
-    # Open raster and sample values
+    # Open raster and gather values at centroid pixels
     # -----------------------------------------------------------------
     with rasterio.open(raster_path) as src:
         # Ensure CRS consistency between raster and vector data
@@ -71,18 +263,15 @@ def sample_raster_at_centroids(
                 "Ensure both datasets share the same CRS before sampling."
             )
 
-        # Extract (x, y) coordinates of centroids
-        coords = [(pt.x, pt.y) for pt in centroids]
-
-        # Sample raster values at centroid locations
-        sampled = list(src.sample(coords))
-
-    # -----------------------------------------------------------------
-    # Store sampled raster values
-    # -----------------------------------------------------------------
-    # Rasterio returns values as arrays (one per band),
-    # so we flatten them into a 1D NumPy array.
-    values = np.array(sampled).flatten()
+        fill = src.nodata if src.nodata is not None else 0
+        rows, cols, inside = pixel_indices(src.transform, src.shape, xs, ys)
+        if raster_data is None:
+            values = read_pixels(
+                src, rows, cols, inside, fill=fill, max_workers=max_workers
+            )
+        else:
+            values = raster_data[rows, cols]
+            values[~inside] = fill
 
     # Add sampled values to the GeoDataFrame
     gdf[value_field] = values
@@ -120,14 +309,71 @@ def classify_flooded(
     Returns
     -------
     geopandas.GeoDataFrame
-        Buildings GeoDataFrame with a binary flooded indicator:
+        Buildings GeoDataFrame with a binary int8 flooded indicator:
         - 1 = flooded
         - 0 = not flooded
     """
-    # Defensive copy
-    gdf = buildings.copy()
+    # Shallow copy: only a new column is added, existing ones are shared
+    gdf = buildings.copy(deep=False)
 
     # Apply threshold-based classification
-    gdf[flooded_field] = (gdf[value_field] > threshold).astype(int)
+    gdf[flooded_field] = (gdf[value_field].to_numpy() > threshold).astype(np.int8)
+
+    return gdf
 
-    return gdf
\ No newline at end of file
+# ---------------------------------------------------------------------
+# Sampling + classification in one pass
+# ---------------------------------------------------------------------
+
+def sample_and_classify(
+    buildings: gpd.GeoDataFrame,
+    raster_path: Path,
+    threshold: float = 0.5,
+    value_field: str = "flood_value",
+    flooded_field: str = "flooded",
+    raster_data: np.ndarray | None = None,
+    max_workers: int | None = None,
+    xy: tuple[np.ndarray, np.ndarray] | None = None,
+) -> gpd.GeoDataFrame:
+    """
+    Sample the flood raster at building centroids and classify buildings.
+
+    Equivalent to :func:`sample_raster_at_centroids` followed by
+    :func:`classify_flooded`, but only one new frame is created.
+
+    Parameters
+    ----------
+    buildings : geopandas.GeoDataFrame
+        Building footprint geometries (polygons).
+    raster_path : pathlib.Path
+        Path to the raster flood mask (e.g. flood_mask_filtered.tif).
+    threshold : float, default 0.5
+        Threshold above which a building is considered flooded.
+    value_field : str, default "flood_value"
+        Name of the column used to store the sampled raster values.
+    flooded_field : str, default "flooded"
+        Name of the binary flood indicator column to create.
+    raster_data : numpy.ndarray, optional
+        First band of ``raster_path`` if it has already been read.
+    max_workers : int, optional
+        Number of threads reading raster blocks.
+    xy : tuple of numpy.ndarray, optional
+        Precomputed centroid coordinates of ``buildings``.
+
+    Returns
+    -------
+    geopandas.GeoDataFrame
+        Buildings with the sampled value column and an int8 flooded
+        indicator (1 = flooded, 0 = not flooded).
+    """
+    # sample_raster_at_centroids already returns a new (shallow) frame
+    gdf = sample_raster_at_centroids(
+        buildings,
+        raster_path,
+        value_field=value_field,
+        raster_data=raster_data,
+        max_workers=max_workers,
+        xy=xy,
+    )
+    gdf[flooded_field] = (gdf[value_field].to_numpy() > threshold).astype(np.int8)
+    return gdf
@@ -2,16 +2,29 @@
 Vector I/O utilities for the vector processing stage (Stage C).
 
 This module handles reading and writing of vector datasets using
-GeoPandas (Fiona backend). It isolates file system access from
+GeoPandas (pyogrio engine). It isolates file system access from
 processing logic to improve modularity and reproducibility.
+
+Readers accept an optional AOI: only features intersecting its bounding
+box are read from disk, which avoids loading country-wide datasets.
+When pyarrow is installed and importable, pyogrio returns the features as
+Arrow tables, which skips its per-feature Python conversion. Set the
+environment variable FLOOD_USE_ARROW=0 to always read without Arrow.
 """
 
+import os
+from functools import lru_cache
+
 import geopandas as gpd
+import pyogrio
+import pyogrio.errors
+from pyproj import Transformer
 
 from flood_project.config.paths import (
     BUILDINGS_RAW,
     ADMIN_GPKG,
     ADMIN_LAYER,
+    ADMIN_CACHE,
 )
 
 
@@ -19,35 +32,221 @@ from flood_project.config.paths import (
 # Reading functions
 # ---------------------------------------------------------------------
 
-def read_buildings():
+@lru_cache(maxsize=None)
+def _pyarrow_importable():
+    """True if pyarrow imports (an installed but broken build counts as absent)."""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def use_arrow():
+    """
+    Whether vector reads go through pyogrio's Arrow interface.
+
+    Returns
+    -------
+    bool
+        False if the FLOOD_USE_ARROW environment variable is set to
+        "0", "false", "no" or "off", or if pyarrow cannot be imported.
+    """
+    flag = os.environ.get("FLOOD_USE_ARROW", "").strip().lower()
+    if flag in ("0", "false", "no", "off"):
+        return False
+    return _pyarrow_importable()
+
+
+def _read_file(path, **kwargs):
+    """``geopandas.read_file`` with the pyogrio engine (Arrow if available)."""
+    return gpd.read_file(path, engine="pyogrio", use_arrow=use_arrow(), **kwargs)
+
+
+def aoi_bbox(path, aoi, layer=None):
+    """
+    Bounding box of an AOI expressed in the CRS of a vector dataset.
+
+    The AOI bounds are reprojected with densified edges, so the box
+    fully covers the AOI even when the CRS change curves its sides.
+
+    Parameters
+    ----------
+    path : pathlib.Path or str
+        Vector dataset path.
+    aoi : geopandas.GeoDataFrame
+        Area of interest with a defined CRS.
+    layer : str, optional
+        Layer name for multi-layer datasets.
+
+    Returns
+    -------
+    tuple of float or None
+        (minx, miny, maxx, maxy) in the dataset CRS, or None if the
+        dataset has no CRS.
+    """
+    crs = pyogrio.read_info(path, layer=layer).get("crs")
+    if crs is None:
+        return None
+    transformer = Transformer.from_crs(aoi.crs, crs, always_xy=True)
+    return transformer.transform_bounds(*aoi.total_bounds, densify_pts=21)
+
+
+def read_buildings(aoi=None, limit=None):
     """
     Read raw building footprint data.
 
+    Parameters
+    ----------
+    aoi : geopandas.GeoDataFrame, optional
+        If given, only buildings intersecting the AOI bounding box are read.
+    limit : int, optional
+        If given, only the first ``limit`` features are read (the driver stops
+        there instead of decoding the whole dataset).
+
     Returns
     -------
     geopandas.GeoDataFrame
         GeoDataFrame containing building geometries and attributes.
     """
-    return gpd.read_file(BUILDINGS_RAW)
+    bbox = None if aoi is None else aoi_bbox(BUILDINGS_RAW, aoi)
+    return _read_file(BUILDINGS_RAW, bbox=bbox, rows=limit)
+
 
+# Column of ADMIN_CACHE holding each unit's row number in ADMIN_LAYER
+_ADMIN_ROW = "_gpkg_row"
 
-def read_admin_units():
+
+def _admin_cache_is_fresh():
+    """True if ADMIN_CACHE exists, is not older than ADMIN_GPKG and has row numbers."""
+    return (
+        ADMIN_CACHE.exists()
+        and ADMIN_GPKG.exists()
+        and ADMIN_CACHE.stat().st_mtime >= ADMIN_GPKG.stat().st_mtime
+        and _ADMIN_ROW in pyogrio.read_info(ADMIN_CACHE)["fields"]
+    )
+
+
+def cache_admin_units():
+    """
+    Materialize the ADM level 3 layer as a FlatGeobuf file, if outdated.
+
+    FlatGeobuf stores a packed Hilbert R-tree alongside the features, so
+    bounding box reads of the cached copy use the index built at write
+    time instead of building one per run. The cache is rebuilt only when
+    it is missing or older than the GADM geopackage; its file name
+    includes the layer name, so each layer has its own copy.
+
+    The index also stores the features in Hilbert order, so each feature
+    keeps its geopackage row number in an extra column, used by
+    :func:`read_admin_units` to restore the original order.
+
+    This is the only function writing the cache; it is called by the
+    Stage C entry point, readers never write.
+
+    Returns
+    -------
+    pathlib.Path or None
+        Path of the cached dataset, or None if it could not be written
+        (the geopackage should then be read directly).
+    """
+    if _admin_cache_is_fresh():
+        return ADMIN_CACHE
+
+    admin_units = _read_file(ADMIN_GPKG, layer=ADMIN_LAYER)
+    admin_units[_ADMIN_ROW] = range(len(admin_units))
+    tmp = ADMIN_CACHE.with_name(ADMIN_CACHE.stem + ".tmp.fgb")
+    try:
+        ADMIN_CACHE.parent.mkdir(parents=True, exist_ok=True)
+        admin_units.to_file(
+            tmp,
+            driver="FlatGeobuf",
+            engine="pyogrio",
+            layer_options={"SPATIAL_INDEX": "YES"},
+        )
+        # Atomic swap, so an interrupted write never leaves a partial cache
+        os.replace(tmp, ADMIN_CACHE)
+    except (OSError, pyogrio.errors.DataSourceError):
+        tmp.unlink(missing_ok=True)
+        return None
+    return ADMIN_CACHE
+
+
+def read_admin_units(aoi=None):
     """
     Read administrative boundary data (ADM level 3) from GADM geopackage.
 
+    The FlatGeobuf cache from :func:`cache_admin_units` is read instead
+    when it exists and is up to date; its rows are sorted back into
+    geopackage order (which decides ties in the spatial join), so the
+    result is the same. This function never creates or refreshes the cache.
+
+    Parameters
+    ----------
+    aoi : geopandas.GeoDataFrame, optional
+        If given, only units intersecting the AOI bounding box are read.
+
     Returns
     -------
     geopandas.GeoDataFrame
         GeoDataFrame containing administrative boundaries at ADM level 3.
     """
-    return gpd.read_file(ADMIN_GPKG, layer=ADMIN_LAYER)
+    if _admin_cache_is_fresh():
+        bbox = None if aoi is None else aoi_bbox(ADMIN_CACHE, aoi)
+        admin_units = _read_file(ADMIN_CACHE, bbox=bbox)
+        return (
+            admin_units.sort_values(_ADMIN_ROW, kind="stable")
+            .drop(columns=_ADMIN_ROW)
+            .reset_index(drop=True)
+        )
+
+    bbox = None if aoi is None else aoi_bbox(ADMIN_GPKG, aoi, layer=ADMIN_LAYER)
+    return _read_file(ADMIN_GPKG, layer=ADMIN_LAYER, bbox=bbox)
+
+
+def read_vector(path, parquet_path=None, columns=None):
+    """
+    Read a vector dataset, preferring an up-to-date GeoParquet copy.
+
+    GeoParquet is columnar and reads much faster than GeoPackage, so the
+    copy is used when it exists, is not older than ``path`` and pyarrow
+    is installed.
+
+    Parameters
+    ----------
+    path : pathlib.Path
+        Vector dataset path (e.g. a GeoPackage).
+    parquet_path : pathlib.Path, optional
+        GeoParquet copy of the same data.
+    columns : list of str, optional
+        Attribute columns to read (the geometry is always read). With
+        GeoParquet, the other columns are not even decoded.
+
+    Returns
+    -------
+    geopandas.GeoDataFrame
+        The dataset.
+    """
+    if (
+        parquet_path is not None
+        and parquet_path.exists()
+        and (not path.exists() or parquet_path.stat().st_mtime >= path.stat().st_mtime)
+    ):
+        try:
+            return gpd.read_parquet(
+                parquet_path,
+                columns=None if columns is None else [*columns, "geometry"],
+            )
+        except ImportError:
+            pass
+    return _read_file(path, columns=columns)
 
 
 # ---------------------------------------------------------------------
 # Writing functions
 # ---------------------------------------------------------------------
 
-def write_vector(gdf, output_path):
+def write_vector(gdf, output_path, spatial_index=True):
     """
     Write a GeoDataFrame to disk.
 
@@ -57,5 +256,36 @@ def write_vector(gdf, output_path):
         GeoDataFrame to be written.
     output_path : pathlib.Path or str
         Destination file path.
+    spatial_index : bool, default True
+        Build the GeoPackage R-tree index. Disable it for intermediate
+        outputs that are only read back in full by a later stage.
+    """
+    gdf.to_file(
+        output_path,
+        driver="GPKG",
+        engine="pyogrio",
+        layer_options={"SPATIAL_INDEX": "YES" if spatial_index else "NO"},
+    )
+
+
+def write_geoparquet(gdf, output_path):
+    """
+    Write a GeoDataFrame to GeoParquet, if pyarrow is available.
+
+    Parameters
+    ----------
+    gdf : geopandas.GeoDataFrame
+        GeoDataFrame to be written.
+    output_path : pathlib.Path or str
+        Destination file path.
+
+    Returns
+    -------
+    bool
+        True if the file was written, False if pyarrow is not installed.
     """
-    gdf.to_file(output_path, driver="GPKG")
\ No newline at end of file
+    try:
+        gdf.to_parquet(output_path)
+    except ImportError:
+        return False
+    return True
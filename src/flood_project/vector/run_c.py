@@ -19,6 +19,11 @@ Run this module from the project root using:
     or using conda
     python src/flood_project/vector/run_c.py
 
+The AOI clip and admin join run in GeoPandas by default. Set the
+environment variable FLOOD_SPATIAL_BACKEND=duckdb to run them as one
+DuckDB query instead (needs duckdb with its spatial extension
+installed; falls back to GeoPandas with a warning otherwise).
+
 Inputs
 ------
 - Building footprints (vector)
@@ -28,10 +33,15 @@ Inputs
 Outputs
 -------
 - outputs/vector/buildings_admin.gpkg
+- outputs/vector/buildings_admin.parquet (if pyarrow is installed)
 - outputs/vector/admin_units_adm3.gpkg
+- outputs/vector/gadm41_GRC_ADM_ADM_3.fgb (FlatGeobuf copy of the admin
+  layer, reused by later runs)
 - outputs/reports/qc_vector_prep.txt
 """
+import os
 import sys
+import warnings
 from pathlib import Path
 
 # Add project root /src to PYTHONPATH
@@ -41,6 +51,7 @@ if str(PROJECT_ROOT) not in sys.path:
 
 from flood_project.config.paths import (
     BUILDINGS_ADMIN,
+    BUILDINGS_ADMIN_PARQUET,
     ADMIN_OUT,
     QC_VECTOR,
     AOI_RASTER,
@@ -50,8 +61,10 @@ from flood_project.config.paths import (
 )
 
 from flood_project.vector.io import (
+    cache_admin_units,
     read_buildings,
     read_admin_units,
+    write_geoparquet,
     write_vector,
 )
 
@@ -67,11 +80,23 @@ from flood_project.vector.spatial import (
     assign_admin_id,
 )
 
+from flood_project.vector.spatial_duckdb import clip_and_assign
+
 from flood_project.vector.aoi import aoi_from_raster
 
 
-def main():
-    """Run the complete vector processing pipeline (Stage C)."""
+def main(use_duckdb=None):
+    """
+    Run the complete vector processing pipeline (Stage C).
+
+    Parameters
+    ----------
+    use_duckdb : bool, optional
+        Run the AOI clip and admin join in DuckDB. Defaults to True only
+        if FLOOD_SPATIAL_BACKEND is set to "duckdb".
+    """
+    if use_duckdb is None:
+        use_duckdb = os.environ.get("FLOOD_SPATIAL_BACKEND", "").strip().lower() == "duckdb"
 
     # -----------------------------------------------------------------
     # Prepare output directories
@@ -81,19 +106,19 @@ def main():
     REPORTS_DIR.mkdir(parents=True, exist_ok=True)
 
     # -----------------------------------------------------------------
-    # Read inputs
+    # Extract AOI from raster, directly in project CRS (UTM 34N)
     # -----------------------------------------------------------------
-    buildings = read_buildings()
-    admin_units = read_admin_units()
+    TARGET_CRS = "EPSG:32634"
+    aoi = aoi_from_raster(AOI_RASTER, TARGET_CRS)
 
     # -----------------------------------------------------------------
-    # Extract AOI from raster
+    # Read inputs (only features within the AOI bounding box)
     # -----------------------------------------------------------------
-    TARGET_CRS = "EPSG:32634"
-    aoi = aoi_from_raster(AOI_RASTER)
-    
-    # Reproject AOI to project CRS (UTM 34N)
-    aoi = aoi.to_crs(TARGET_CRS)
+    buildings = read_buildings(aoi)
+    # Refresh the indexed FlatGeobuf copy of the admin layer if needed;
+    # read_admin_units then reads it instead of the geopackage
+    cache_admin_units()
+    admin_units = read_admin_units(aoi)
 
     # -----------------------------------------------------------------
     # Geometry cleaning
@@ -112,21 +137,32 @@ def main():
     admin_units = ensure_same_crs(admin_units, TARGET_CRS)
 
     # -----------------------------------------------------------------
-    # Clip to raster-derived AOI
+    # Clip to raster-derived AOI + spatial join: assign admin_id to buildings
     # -----------------------------------------------------------------
-    buildings = clip_to_aoi(buildings, aoi)
     admin_units = clip_to_aoi(admin_units, aoi)
 
-    # -----------------------------------------------------------------
-    # Spatial join: assign admin_id to buildings
-    # -----------------------------------------------------------------
-    buildings = assign_admin_id(buildings, admin_units)
+    # One DuckDB query if requested and available, GeoPandas otherwise
+    if use_duckdb:
+        try:
+            buildings = clip_and_assign(buildings, admin_units, aoi)
+        except ImportError as exc:
+            warnings.warn(f"DuckDB backend unavailable ({exc}); using GeoPandas")
+            use_duckdb = False
+    if not use_duckdb:
+        buildings = clip_to_aoi(buildings, aoi)
+        buildings = assign_admin_id(buildings, admin_units)
 
     # -----------------------------------------------------------------
     # Write outputs
     # -----------------------------------------------------------------
-    write_vector(buildings, BUILDINGS_ADMIN)
-    write_vector(admin_units, ADMIN_OUT)
+    # Intermediate outputs, read back in full by Stage D: skip the R-tree
+    write_vector(buildings, BUILDINGS_ADMIN, spatial_index=False)
+    write_vector(admin_units, ADMIN_OUT, spatial_index=False)
+
+    # Faster-to-read copy of the buildings for Stage D (needs pyarrow),
+    # with admin_id dictionary-encoded as Stage D groups on it
+    buildings["admin_id"] = buildings["admin_id"].astype("category")
+    write_geoparquet(buildings, BUILDINGS_ADMIN_PARQUET)
 
     # -----------------------------------------------------------------
     # Quality control report
@@ -139,6 +175,7 @@ def main():
         report.write(f"Invalid geometries before cleaning: {invalid_before}\n")
         report.write(f"Invalid geometries after cleaning: {invalid_after}\n\n")
         report.write(f"CRS used: {TARGET_CRS}\n")
+        report.write(f"Spatial backend: {'duckdb' if use_duckdb else 'geopandas'}\n")
         report.write(
             f"Buildings without admin_id: "
             f"{buildings['admin_id'].isna().sum()}\n"
@@ -19,7 +19,6 @@ import sys
 from pathlib import Path
 
 import rasterio
-import geopandas as gpd
 import pandas as pd
 import numpy as np
 
@@ -33,14 +32,20 @@ if str(PROJECT_ROOT) not in sys.path:
 from flood_project.config.paths import (
     OUTPUTS_DIR,
     BUILDINGS_ADMIN,
+    BUILDINGS_ADMIN_PARQUET,
     ADMIN_OUT,
     AOI_RASTER,
 )
 
-from flood_project.vector.io import write_vector
+from flood_project.vector.io import (
+    read_vector,
+    write_geoparquet,
+    write_vector,
+)
 from flood_project.vector.flood_sampling import (
-    sample_raster_at_centroids,
-    classify_flooded,
+    centroid_xy,
+    pixel_indices,
+    sample_and_classify,
 )
 from flood_project.vector.aggregation import aggregate_by_admin
 
@@ -55,21 +60,23 @@ def main():
     vector_out_dir.mkdir(parents=True, exist_ok=True)
 
     buildings_flooded_path = vector_out_dir / "buildings_flooded.gpkg"
+    buildings_flooded_parquet = vector_out_dir / "buildings_flooded.parquet"
     admin_summary_gpkg = vector_out_dir / "admin_flood_summary.gpkg"
+    admin_summary_parquet = vector_out_dir / "admin_flood_summary.parquet"
     admin_summary_csv = vector_out_dir / "admin_flood_summary.csv"
 
     # -----------------------------------------------------------------
     # Read inputs from Stage C
     # -----------------------------------------------------------------
-    buildings = gpd.read_file(BUILDINGS_ADMIN)
-    admin_units = gpd.read_file(ADMIN_OUT)
+    buildings = read_vector(BUILDINGS_ADMIN, BUILDINGS_ADMIN_PARQUET)
+    admin_units = read_vector(ADMIN_OUT)
 
     # -----------------------------------------------------------------
-    # Open raster and extract data mask
+    # Open raster metadata (the band itself is read block by block)
     # -----------------------------------------------------------------
     with rasterio.open(AOI_RASTER) as src:
         raster_crs = src.crs
-        raster_data = src.read(1)
+        raster_shape = src.shape
         transform = src.transform
         nodata = src.nodata
 
@@ -82,57 +89,47 @@ def main():
     if admin_units.crs != raster_crs:
         admin_units = admin_units.to_crs(raster_crs)
 
-    # -----------------------------------------------------------------
-    # Filter buildings: centroid must fall on EXISTING raster pixel
-    # -----------------------------------------------------------------
-    def centroid_on_valid_pixel(geom):
-        x, y = geom.centroid.x, geom.centroid.y
-        col, row = ~transform * (x, y)
-        row, col = int(row), int(col)
-
-        # Outside raster grid
-        if row < 0 or col < 0:
-            return False
-        if row >= raster_data.shape[0] or col >= raster_data.shape[1]:
-            return False
-
-        value = raster_data[row, col]
-
-        # Pixel exists (not outside raster)
-        if nodata is not None:
-            return value != nodata
-        return True
-
-    buildings = buildings[
-        buildings.geometry.apply(centroid_on_valid_pixel)
-    ].copy()
-
     # -----------------------------------------------------------------
     # Ensure consistent admin_id field
     # -----------------------------------------------------------------
     admin_units = admin_units.rename(columns={"GID_3": "admin_id"})
 
     # -----------------------------------------------------------------
-    # Raster–vector integration: centroid sampling
+    # Raster–vector integration: centroid sampling + classification
     # -----------------------------------------------------------------
-    buildings = sample_raster_at_centroids(
-        buildings=buildings,
-        raster_path=AOI_RASTER,
-        value_field="flood_value",
-    )
+    # Centroids are computed once and reused by the valid-pixel filter
+    xs, ys = centroid_xy(buildings.geometry)
 
-    buildings = classify_flooded(
+    # Only the raster blocks under building centroids are read
+    buildings = sample_and_classify(
         buildings=buildings,
+        raster_path=AOI_RASTER,
+        threshold=0.5,
         value_field="flood_value",
         flooded_field="flooded",
-        threshold=0.5,
+        xy=(xs, ys),
     )
 
+    # -----------------------------------------------------------------
+    # Filter buildings: centroid must fall on EXISTING raster pixel
+    # -----------------------------------------------------------------
+    if nodata is not None:
+        # Centroids off the grid were sampled as nodata too
+        on_valid_pixel = buildings["flood_value"].to_numpy() != nodata
+    else:
+        _, _, on_valid_pixel = pixel_indices(transform, raster_shape, xs, ys)
+
+    # Boolean indexing already returns a new frame; no further copy needed
+    buildings = buildings[on_valid_pixel]
+
     # -----------------------------------------------------------------
     # Write per-building output
     # -----------------------------------------------------------------
     write_vector(buildings, buildings_flooded_path)
 
+    # Faster-to-read copy for Stage E (needs pyarrow)
+    write_geoparquet(buildings, buildings_flooded_parquet)
+
     # -----------------------------------------------------------------
     # Aggregate flood impact by administrative unit
     # -----------------------------------------------------------------
@@ -143,6 +140,7 @@ def main():
     )
 
     write_vector(admin_summary, admin_summary_gpkg)
+    write_geoparquet(admin_summary, admin_summary_parquet)
 
     admin_summary.drop(columns="geometry").to_csv(
         admin_summary_csv,
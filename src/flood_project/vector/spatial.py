@@ -1,7 +1,8 @@
 """
 Spatial operations for vector data (Stage C).
 
-This module performs spatial operations using GeoPandas and pyproj.
+This module performs spatial operations using GeoPandas, Shapely
+and pyproj.
 It assumes that the Area of Interest (AOI) is defined externally
 (e.g., from a raster extent generated in stages A/B) and provided
 as a vector geometry.
@@ -14,13 +15,25 @@ The module is responsible for:
 This module does NOT handle file I/O or geometry cleaning.
 """
 
+from functools import lru_cache
+
 import geopandas as gpd
+import numpy as np
+import pandas as pd
+import shapely
+from pyproj import CRS
 
 
 # ---------------------------------------------------------------------
 # CRS handling
 # ---------------------------------------------------------------------
 
+@lru_cache(maxsize=None)
+def _crs_from_user_input(crs) -> CRS:
+    """Parse a (hashable) CRS definition such as an EPSG string only once."""
+    return CRS.from_user_input(crs)
+
+
 def ensure_same_crs(
     gdf: gpd.GeoDataFrame,
     target_crs
@@ -28,6 +41,9 @@ def ensure_same_crs(
     """
     Reproject a GeoDataFrame to a target CRS if needed.
 
+    Cheap checks (object identity, then identical definitions) run
+    before the full pyproj equivalence test.
+
     Parameters
     ----------
     gdf : geopandas.GeoDataFrame
@@ -40,9 +56,12 @@ def ensure_same_crs(
     geopandas.GeoDataFrame
         GeoDataFrame in the target CRS.
     """
-    if gdf.crs != target_crs:
-        return gdf.to_crs(target_crs)
-    return gdf
+    target = target_crs if isinstance(target_crs, CRS) else _crs_from_user_input(target_crs)
+    crs = gdf.crs
+
+    if crs is target or (crs is not None and crs.srs == target.srs) or crs == target:
+        return gdf
+    return gdf.to_crs(target)
 
 
 # ---------------------------------------------------------------------
@@ -59,6 +78,10 @@ def clip_to_aoi(
     The AOI is expected to be provided as a GeoDataFrame representing
     the spatial extent of the raster used in stages A/B.
 
+    Candidate features are found with one spatial index query. Those
+    lying entirely inside the AOI are kept unchanged; only the ones
+    crossing its boundary are intersected with it.
+
     Parameters
     ----------
     gdf : geopandas.GeoDataFrame
@@ -71,7 +94,32 @@ def clip_to_aoi(
     geopandas.GeoDataFrame
         GeoDataFrame clipped to the AOI.
     """
-    return gpd.clip(gdf, aoi)
+    mask = aoi.geometry.union_all()
+
+    # Features intersecting the AOI, in input order
+    cand = np.sort(gdf.sindex.query(mask, predicate="intersects"))
+    geoms = np.asarray(gdf.geometry.values)[cand]
+
+    # True hits: bounding box inside the AOI box (and, for a non-rectangular
+    # AOI, covered by it) -- these need no clipping
+    xmin, ymin, xmax, ymax = mask.bounds
+    bounds = shapely.bounds(geoms)
+    inside = (
+        (bounds[:, 0] >= xmin)
+        & (bounds[:, 1] >= ymin)
+        & (bounds[:, 2] <= xmax)
+        & (bounds[:, 3] <= ymax)
+    )
+    if not mask.equals(mask.envelope):
+        shapely.prepare(mask)
+        inside[inside] = shapely.covers(mask, geoms[inside])
+
+    clipped = geoms.copy()
+    clipped[~inside] = shapely.intersection(geoms[~inside], mask)
+
+    out = gdf.iloc[cand].copy(deep=False)
+    out[gdf.geometry.name] = gpd.GeoSeries(clipped, index=out.index, crs=gdf.crs)
+    return out
 
 
 # ---------------------------------------------------------------------
@@ -87,12 +135,22 @@ def assign_admin_id(
     Assign an administrative unit identifier to each building
     using a spatial join.
 
-    Buildings are assigned to administrative units based on a
-    'within' spatial predicate. The administrative identifier
-    is standardized to a column named 'admin_id' in the output,
+    Each building is assigned to the administrative unit that
+    contains its representative point (a point guaranteed to lie
+    inside the footprint), so buildings crossing a unit boundary
+    are still assigned. The administrative identifier is
+    standardized to a column named 'admin_id' in the output,
     regardless of the original field name in the administrative
     dataset.
 
+    All points are matched in one vectorized query against the
+    spatial index (STRtree) of ``admin_units``, which GeoPandas
+    builds on first use and caches on the frame. Each building
+    keeps one row: if its point falls in several units (overlaps,
+    or exactly on a shared boundary), the first unit in
+    ``admin_units`` order wins; buildings in no unit get a
+    missing 'admin_id'.
+
     Parameters
     ----------
     buildings : geopandas.GeoDataFrame
@@ -110,18 +168,27 @@ def assign_admin_id(
         the administrative unit each building belongs to.
     """
 
-    # Select identifier and geometry, and standardize column name
-    admin = admin_units[[admin_id_field, "geometry"]].rename(
-        columns={admin_id_field: "admin_id"}
-    )
-
-    # Spatial join: preserve all buildings (left join)
-    joined = gpd.sjoin(
-        buildings,
-        admin,
-        how="left",
-        predicate="within",
-    )
-
-    # Remove join index artifact
-    return joined.drop(columns="index_right")
\ No newline at end of file
+    # One point per building: point-in-polygon is far cheaper than
+    # polygon-within-polygon
+    points = shapely.point_on_surface(np.asarray(buildings.geometry.values))
+
+    # (building, admin unit) index pairs where the unit covers the point;
+    # the cached sindex is reused when the same admin frame is joined again
+    bldg_idx, admin_idx = admin_units.sindex.query(points, predicate="intersects")
+
+    # Keep the first admin unit (in admin_units order) for each building
+    order = np.lexsort((admin_idx, bldg_idx))
+    bldg_idx, admin_idx = bldg_idx[order], admin_idx[order]
+    first = np.ones(bldg_idx.size, dtype=bool)
+    first[1:] = bldg_idx[1:] != bldg_idx[:-1]
+    ids = admin_units[admin_id_field].to_numpy()
+
+    # Left-join semantics: unmatched buildings get a missing identifier
+    admin_id = pd.Series(
+        ids[admin_idx[first]], index=bldg_idx[first]
+    ).reindex(np.arange(len(buildings)))
+
+    # Shallow copy: only the new column is added
+    joined = buildings.copy(deep=False)
+    joined["admin_id"] = admin_id.to_numpy()
+    return joined
\ No newline at end of file
@@ -0,0 +1,147 @@
+"""
+DuckDB backend for the Stage C spatial operations.
+
+This module runs the AOI clip and the administrative unit assignment
+of buildings as a single SQL query in DuckDB's spatial extension, which
+evaluates the spatial join with its own R-tree instead of Python-side
+loops. It gives the same result as calling
+:func:`flood_project.vector.spatial.clip_to_aoi` followed by
+:func:`flood_project.vector.spatial.assign_admin_id`.
+
+DuckDB is optional and only used when requested (see run_c). If it, or
+its spatial extension, is not available, :func:`clip_and_assign` raises
+ImportError and callers fall back to the GeoPandas implementation. The
+extension is only loaded, never downloaded: install it once with
+``duckdb.connect().install_extension("spatial")``.
+"""
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import shapely
+
+
+CLIP_AND_ASSIGN_SQL = """
+WITH aoi AS (
+    SELECT ST_GeomFromWKB($aoi) AS geom
+),
+clipped AS (
+    -- Features inside the AOI are kept as-is, the others are intersected
+    SELECT
+        b.row_id,
+        CASE WHEN ST_CoveredBy(b.geom, aoi.geom) THEN b.geom
+             ELSE ST_Intersection(b.geom, aoi.geom) END AS geom
+    FROM (SELECT row_id, ST_GeomFromWKB(wkb) AS geom FROM buildings_wkb) AS b, aoi
+    WHERE ST_Intersects(b.geom, aoi.geom)
+),
+matches AS (
+    -- First admin unit (in input order) covering the building's representative point
+    SELECT c.row_id, min(a.admin_row) AS admin_row
+    FROM clipped AS c
+    JOIN (SELECT admin_row, ST_GeomFromWKB(wkb) AS geom FROM admin_wkb) AS a
+      ON ST_Intersects(a.geom, ST_PointOnSurface(c.geom))
+    GROUP BY c.row_id
+)
+SELECT c.row_id, ST_AsWKB(c.geom) AS wkb, m.admin_row
+FROM clipped AS c
+LEFT JOIN matches AS m USING (row_id)
+ORDER BY c.row_id
+"""
+
+
+def _connect():
+    """
+    Open an in-memory DuckDB connection with the spatial extension loaded.
+
+    Only an already installed extension is loaded, so no network access
+    happens here.
+
+    Raises
+    ------
+    ImportError
+        If DuckDB is not installed or the spatial extension is not installed.
+    """
+    import duckdb
+
+    con = duckdb.connect(config={"autoinstall_known_extensions": False})
+    try:
+        con.load_extension("spatial")
+    except duckdb.Error as exc:
+        con.close()
+        raise ImportError(
+            "DuckDB spatial extension is not installed "
+            "(run duckdb.connect().install_extension('spatial') once)"
+        ) from exc
+    return con
+
+
+def _wkb_frame(gdf: gpd.GeoDataFrame, id_name: str) -> pd.DataFrame:
+    """Row position and WKB geometry of a GeoDataFrame, for DuckDB."""
+    return pd.DataFrame(
+        {
+            id_name: np.arange(len(gdf), dtype=np.int64),
+            "wkb": shapely.to_wkb(np.asarray(gdf.geometry.values)),
+        }
+    )
+
+
+def clip_and_assign(
+    buildings: gpd.GeoDataFrame,
+    admin_units: gpd.GeoDataFrame,
+    aoi: gpd.GeoDataFrame,
+    admin_id_field: str = "GID_3",
+) -> gpd.GeoDataFrame:
+    """
+    Clip buildings to the AOI and assign an administrative unit identifier.
+
+    Equivalent to ``assign_admin_id(clip_to_aoi(buildings, aoi), admin_units)``
+    but executed as one DuckDB query. All inputs must share the same CRS.
+
+    Parameters
+    ----------
+    buildings : geopandas.GeoDataFrame
+        Building footprint geometries.
+    admin_units : geopandas.GeoDataFrame
+        Administrative boundaries containing an identifier field.
+    aoi : geopandas.GeoDataFrame
+        AOI geometry derived from raster extent.
+    admin_id_field : str, default "GID_3"
+        Name of the identifier field in the administrative dataset.
+
+    Returns
+    -------
+    geopandas.GeoDataFrame
+        Clipped buildings, in input order, with an added 'admin_id' column
+        (missing for buildings in no administrative unit).
+
+    Raises
+    ------
+    ImportError
+        If DuckDB or its spatial extension is not available.
+    """
+    con = _connect()
+    try:
+        con.register("buildings_wkb", _wkb_frame(buildings, "row_id"))
+        con.register("admin_wkb", _wkb_frame(admin_units, "admin_row"))
+        result = con.execute(
+            CLIP_AND_ASSIGN_SQL,
+            {"aoi": shapely.to_wkb(aoi.geometry.union_all())},
+        ).df()
+    finally:
+        con.close()
+
+    row_id = result["row_id"].to_numpy()
+    out = buildings.iloc[row_id].copy(deep=False)
+    out[buildings.geometry.name] = gpd.GeoSeries.from_wkb(
+        [bytes(wkb) for wkb in result["wkb"]], index=out.index, crs=buildings.crs
+    )
+
+    # Left-join semantics: unmatched buildings get a missing identifier
+    matched = result["admin_row"].notna().to_numpy()
+    ids = admin_units[admin_id_field].to_numpy()
+    admin_id = pd.Series(
+        ids[result["admin_row"].to_numpy()[matched].astype(np.int64)],
+        index=np.flatnonzero(matched),
+    ).reindex(np.arange(len(out)))
+    out["admin_id"] = admin_id.to_numpy()
+    return out
@@ -5,15 +5,75 @@ This module contains functions to visualize flood extent and
 flood impact before, during, and after the flood event.
 """
 
+from itertools import chain
 from pathlib import Path
 
 import geopandas as gpd
+import numpy as np
 import rasterio
 import matplotlib.pyplot as plt
-from rasterio.plot import show
+from rasterio.enums import Resampling
+from rasterio.features import rasterize
+from rasterio.transform import from_bounds
 from matplotlib.patches import Patch
 from shapely.geometry import box
 
+from flood_project.vector.io import read_vector
+
+# RGBA colours of the rasterized building classes (0 = no building)
+BUILDING_COLORS = np.array(
+    [
+        [0, 0, 0, 0],           # background, transparent
+        [189, 189, 189, 153],   # not flooded: #bdbdbd, alpha 0.6
+        [215, 48, 39, 242],     # flooded: #d73027, alpha 0.95
+    ],
+    dtype=np.uint8,
+)
+
+
+def rasterize_buildings(
+    flooded: np.ndarray,
+    not_flooded: np.ndarray,
+    bounds,
+    width: int,
+) -> np.ndarray:
+    """
+    Burn flooded / non-flooded buildings into an RGBA image for display.
+
+    The image covers ``bounds`` with square pixels, ``width`` pixels wide.
+    Flooded buildings are burned last, so they stay on top.
+
+    Parameters
+    ----------
+    flooded, not_flooded : numpy.ndarray
+        Building geometries of each class, in the CRS of ``bounds``.
+    bounds : tuple of float
+        (left, bottom, right, top) extent of the image.
+    width : int
+        Image width in pixels (e.g. figure width in inches x DPI).
+
+    Returns
+    -------
+    numpy.ndarray
+        (height, width, 4) uint8 RGBA image.
+    """
+    left, bottom, right, top = bounds
+    height = max(1, round(width * (top - bottom) / (right - left)))
+    shapes = chain(
+        ((geom, 1) for geom in not_flooded),
+        ((geom, 2) for geom in flooded),
+    )
+    classes = rasterize(
+        shapes,
+        out_shape=(height, width),
+        transform=from_bounds(left, bottom, right, top, width, height),
+        fill=0,
+        all_touched=True,
+        dtype="uint8",
+    )
+    return BUILDING_COLORS[classes]
+
+
 def plot_during_flood(
     raster_path: Path,
     buildings_path: Path,
@@ -23,12 +83,27 @@ def plot_during_flood(
     Map showing flood extent and affected buildings
     during the flood event.
     """
-    buildings = gpd.read_file(buildings_path)
+    # Only the flood flag and geometry are drawn (GeoParquet copy if up to date)
+    buildings = read_vector(
+        buildings_path, buildings_path.with_suffix(".parquet"), columns=["flooded"]
+    )
 
-    # Open raster to get its spatial extent and CRS
+    # Output resolution: 14 in wide figure at 300 dpi
+    display_px = 14 * 300
+
+    # Open raster once: extent, CRS and a display-resolution copy of band 1
+    # (block averages; GDAL uses overviews if the file has them)
     with rasterio.open(raster_path) as src:
         raster_bounds = src.bounds
         raster_crs = src.crs
+        out_w = min(src.width, display_px)
+        out_h = max(1, round(src.height * out_w / src.width))
+        flood_display = src.read(
+            1,
+            out_shape=(out_h, out_w),
+            resampling=Resampling.average,
+            masked=True,
+        )
 
     # Reproject buildings if needed
     if buildings.crs != raster_crs:
@@ -43,35 +118,31 @@ def plot_during_flood(
     # Clip buildings to raster extent
     buildings = gpd.clip(buildings, raster_bbox)
 
-    # Separate flooded / non-flooded after clipping
-    flooded = buildings[buildings["flooded"] == 1]
-    not_flooded = buildings[buildings["flooded"] == 0]
+    # Separate flooded / non-flooded geometries after clipping (only the
+    # geometry arrays are indexed, not two copies of the whole frame)
+    flag = buildings["flooded"].to_numpy()
+    geoms = np.asarray(buildings.geometry.values)
+    flooded = geoms[flag == 1]
+    not_flooded = geoms[flag == 0]
 
     fig, ax = plt.subplots(figsize=(14, 14))
 
-    # Flood raster (background)
-    with rasterio.open(raster_path) as src:
-        show(src, ax=ax, cmap="Blues", alpha=0.25)
-
-    # Non-flooded buildings (background but visible)
-    not_flooded.plot(
-        ax=ax,
-        color="#bdbdbd",
-        edgecolor="black",
-        linewidth=0.3,
-        alpha=0.6,
-        zorder=3,
+    raster_extent = (
+        raster_bounds.left,
+        raster_bounds.right,
+        raster_bounds.bottom,
+        raster_bounds.top,
     )
 
-    # Flooded buildings (foreground)
-    flooded.plot(
-        ax=ax,
-        color="#d73027",
-        edgecolor="red",
-        linewidth=0.5,
-        alpha=0.95,
-        zorder=4,
+    # Flood raster (background)
+    ax.imshow(flood_display, extent=raster_extent, cmap="Blues", alpha=0.25)
+
+    # Buildings burned into one image at the output resolution (14 in x 300 dpi)
+    # instead of one matplotlib patch per polygon; flooded ones on top
+    buildings_rgba = rasterize_buildings(
+        flooded, not_flooded, raster_bounds, width=display_px
     )
+    ax.imshow(buildings_rgba, extent=raster_extent, interpolation="nearest", zorder=3)
 
     legend_elements = [
         Patch(facecolor="#d73027", edgecolor="black", label="Flooded buildings"),
@@ -95,7 +166,11 @@ def plot_admin_impact(
     Choropleth map showing relative flood impact by
     administrative unit (percentage of flooded buildings).
     """
-    admin = gpd.read_file(admin_summary_path)
+    admin = read_vector(
+        admin_summary_path,
+        admin_summary_path.with_suffix(".parquet"),
+        columns=["flooded_ratio"],
+    )
 
     # Convert ratio to percentage for visualization
     admin["flooded_pct"] = admin["flooded_ratio"] * 100
@@ -3,9 +3,10 @@ Plotting utilities for flood impact summaries (Stage E).
 """
 
 from pathlib import Path
-import geopandas as gpd
 import matplotlib.pyplot as plt
 
+from flood_project.vector.io import read_vector
+
 
 def plot_flooded_buildings_bar(
     admin_summary_path: Path,
@@ -25,7 +26,11 @@ def plot_flooded_buildings_bar(
     top_n : int, default 10
         Number of administrative units to display.
     """
-    admin = gpd.read_file(admin_summary_path)
+    admin = read_vector(
+        admin_summary_path,
+        admin_summary_path.with_suffix(".parquet"),
+        columns=["NAME_3", "flooded_buildings"],
+    )
 
     admin_sorted = (
         admin.sort_values("flooded_buildings", ascending=False)
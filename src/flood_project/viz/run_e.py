@@ -5,6 +5,8 @@ This script generates static maps and plots to communicate
 the results of the flood impact analysis.
 """
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from pathlib import Path
 
 # Add project root /src to PYTHONPATH
@@ -47,23 +49,32 @@ def main():
     # -------------------------------------------------------------
     # Generate maps and plots
     # -------------------------------------------------------------
-
-    plot_during_flood(
-    raster_path=raster_path,
-    buildings_path=buildings_during_path,
-    output_path=fig_during,
-    )
-
-    plot_admin_impact(
-        admin_summary_path=admin_summary_path,
-        output_path=fig_admin,
-    )
-
-    plot_flooded_buildings_bar(
-        admin_summary_path=admin_summary_path,
-        output_path=fig_bar,
-        top_n=10,
-    )
+    # Figures are independent and savefig-bound; pyplot is not
+    # thread-safe, so each one is rendered in its own process
+    jobs = [
+        partial(
+            plot_during_flood,
+            raster_path=raster_path,
+            buildings_path=buildings_during_path,
+            output_path=fig_during,
+        ),
+        partial(
+            plot_admin_impact,
+            admin_summary_path=admin_summary_path,
+            output_path=fig_admin,
+        ),
+        partial(
+            plot_flooded_buildings_bar,
+            admin_summary_path=admin_summary_path,
+            output_path=fig_bar,
+            top_n=10,
+        ),
+    ]
+
+    with ProcessPoolExecutor(max_workers=len(jobs)) as ex:
+        futures = [ex.submit(job) for job in jobs]
+        for future in futures:
+            future.result()  # re-raise any plotting error
 
 
 if __name__ == "__main__":
@@ -0,0 +1,76 @@
+"""
+ndwi_codec.py
+
+Compact int16 storage of NDWI rasters, shared by the NDWI producers
+(ndwi_series) and readers (cube_demo).
+
+NDWI lies in [-1, 1], so it is stored as q = round(NDWI / NDWI_Q_SCALE) in
+int16 with NDWI_Q_NODATA for invalid pixels, and the scale is recorded as
+the GeoTIFF band scale. Readers apply the band scale back with `unscale`.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Tuple
+
+import numpy as np
+import rasterio
+
+
+# int16 storage for NDWI in [-1, 1]: value = q * NDWI_Q_SCALE, invalid = NDWI_Q_NODATA
+NDWI_Q_SCALE = 1e-4
+NDWI_Q_NODATA = -32768
+
+
+def quantize_ndwi(
+    arr: np.ndarray,
+    nodata: float | int | None,
+    out: np.ndarray | None = None,
+) -> np.ndarray:
+    """
+    Quantize NDWI to int16 with a 1e-4 step (half the bytes of float32).
+
+    Parameters
+    ----------
+    arr : np.ndarray
+        Float NDWI array.
+    nodata : float | int | None
+        Nodata value mapped to NDWI_Q_NODATA (NaN is always mapped).
+    out : np.ndarray | None, optional
+        Preallocated int16 array to write into.
+
+    Returns
+    -------
+    np.ndarray
+        Int16 array; multiply by NDWI_Q_SCALE to recover NDWI.
+    """
+    if out is None:
+        out = np.empty(arr.shape, dtype=np.int16)
+    q = np.rint(arr * np.float32(1.0 / NDWI_Q_SCALE))
+    np.clip(q, NDWI_Q_NODATA + 1, 32767, out=q)
+    invalid = np.isnan(arr)
+    if nodata is not None:
+        invalid |= arr == np.float32(nodata)
+    np.copyto(out, q, casting="unsafe", where=~invalid)
+    out[invalid] = NDWI_Q_NODATA
+    return out
+
+
+def band_scale(fp: Path) -> Tuple[float, float | int | None]:
+    """Return (scale, nodata) of band 1; scale is 1.0 unless stored quantized."""
+    with rasterio.open(fp) as src:
+        return float(src.scales[0]), src.nodata
+
+
+def unscale(arr: np.ndarray, scale: float, nodata: float | int | None) -> None:
+    """
+    Apply a band scale in place to float data read from an int16-quantized
+    NDWI raster (e.g. ndwi_series with quantize), leaving nodata untouched.
+    """
+    if scale == 1.0:
+        return
+    if nodata is None:
+        arr *= np.float32(scale)
+    else:
+        np.multiply(arr, np.float32(scale), out=arr, where=arr != np.float32(nodata))
@@ -10,19 +10,25 @@ This module is designed for filenames like:
 
 It pairs B03 and B08 per date, aligns B08 to the B03 grid if needed,
 computes NDWI = (B03 - B08) / (B03 + B08), and writes Float32 NDWI rasters
-to ndwi_time directory for xarray datacube stacking.
+(tiled, deflate-compressed) to ndwi_time directory for xarray datacube
+stacking. Each date is processed window by window.
 """
 
 from __future__ import annotations
 
+import os
 import re
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+import datetime
 from pathlib import Path
-from typing import Dict, List, Tuple, Any
+from typing import Dict, List, Any
 
 import numpy as np
+import rasterio
 
-from utils_rasterio import read_tif, resample_to_match, same_grid, write_tif
+from utils_rasterio import create_tif, gdal_env, open_aligned, tiled_gtiff_options
+from ndwi_codec import NDWI_Q_NODATA, NDWI_Q_SCALE, quantize_ndwi
 from flood_mask import compute_ndwi
 
 DATE_RE = re.compile(r"(\d{4}-\d{2}-\d{2})")
@@ -36,7 +42,16 @@ class BandPair:
 
 
 def _extract_date(name: str) -> str:
-    """Extract YYYY-MM-DD from filename."""
+    """Extract YYYY-MM-DD from filename (leading date first, regex as fallback)."""
+    head = name[:10]
+    # Cheap shape check first so non-date prefixes never reach fromisoformat
+    if head[4:5] == "-" and head[7:8] == "-":
+        try:
+            if datetime.date.fromisoformat(head).isoformat() == head:
+                return head
+        except ValueError:
+            pass
+
     m = DATE_RE.search(name)
     if not m:
         raise ValueError(f"Cannot parse date from filename: {name}")
@@ -59,10 +74,17 @@ def _collect_pairs(bands_dir: Path) -> Dict[str, BandPair]:
     """
     tmp: Dict[str, Dict[str, Path]] = {}
 
-    for fp in sorted(list(bands_dir.glob("*.tif")) + list(bands_dir.glob("*.tiff"))):
-        if fp.name.endswith(".aux.xml"):
-            continue
+    # One directory pass; hidden files are skipped like glob("*.tif") does
+    with os.scandir(bands_dir) as it:
+        files = sorted(
+            Path(e.path)
+            for e in it
+            if e.name.endswith((".tif", ".tiff"))
+            and not e.name.startswith(".")
+            and e.is_file()
+        )
 
+    for fp in files:
         band = _detect_band(fp.name)
         if band is None:
             continue
@@ -78,6 +100,81 @@ def _collect_pairs(bands_dir: Path) -> Dict[str, BandPair]:
     return pairs
 
 
+def _process_date(
+    date: str,
+    bp: BandPair,
+    scale: float,
+    out_nodata: float,
+    out_dir: Path,
+    quantize: bool = False,
+) -> str:
+    """
+    Compute NDWI for one B03/B08 pair, window by window, and write it to out_dir.
+
+    The output is written tile by tile on the B03 grid; for each tile only
+    the matching B03 window and B08 window are read (B08 is resampled on the
+    fly through a WarpedVRT if its grid differs), so memory stays bounded by
+    the tile size instead of holding both full bands.
+
+    With `quantize`, NDWI is stored as int16 with a 1e-4 step (see
+    ndwi_codec.quantize_ndwi): nodata is NDWI_Q_NODATA and the band scale
+    (GDAL SCALE metadata) is set to NDWI_Q_SCALE, so readers that honour
+    band scales get NDWI back.
+
+    Returns
+    -------
+    str
+        Path of the written NDWI GeoTIFF.
+    """
+    out_fp = out_dir / f"{date}-00_00_{date}-23_59_Sentinel-2_L2A_NDWI.tiff"
+    nodata = np.float32(out_nodata)
+    out_dtype = "int16" if quantize else "float32"
+    file_nodata = NDWI_Q_NODATA if quantize else out_nodata
+
+    with rasterio.open(bp.b03) as src03:
+        prof03 = src03.profile
+        with open_aligned(bp.b08, prof03, method="bilinear", dtype="float32") as src08, create_tif(
+            out_fp, prof03, dtype=out_dtype, nodata=file_nodata, **tiled_gtiff_options(out_dtype)
+        ) as dst:
+            # Bands are read straight into two float32 buffers reused for every
+            # tile, so GDAL converts each pixel once during the read (edge tiles
+            # use a contiguous view of the buffer head)
+            windows = [w for _, w in dst.block_windows(1)]
+            size = max(w.height * w.width for w in windows)
+            buf03 = np.empty(size, dtype=np.float32)
+            buf08 = np.empty(size, dtype=np.float32)
+            qbuf = np.empty(size, dtype=np.int16) if quantize else None
+
+            for window in windows:
+                shape = (window.height, window.width)
+                b03 = buf03[: window.height * window.width].reshape(shape)
+                b08 = buf08[: window.height * window.width].reshape(shape)
+                src03.read(1, window=window, out=b03)
+                src08.read(1, window=window, out=b08)
+
+                # Compute analytical NDWI (float32, a fresh array we may modify);
+                # serial kernel, since dates already run in a thread pool
+                ndwi = compute_ndwi(b03, b08, scale=scale, parallel=False)
+
+                # Basic validity mask (Sentinel-2 reflectance should be > 0);
+                # nodata is stamped in place, with a single boolean temporary
+                invalid = b03 <= 0
+                invalid |= b08 <= 0
+                np.putmask(ndwi, invalid, nodata)
+
+                if quantize:
+                    ndwi = quantize_ndwi(
+                        ndwi, nodata, out=qbuf[: window.height * window.width].reshape(shape)
+                    )
+                dst.write(ndwi, 1, window=window)
+
+            if quantize:
+                dst.scales = (NDWI_Q_SCALE,)
+
+    print(f"[NDWI-Series] {date}: wrote {out_fp.name}")
+    return str(out_fp)
+
+
 def run(cfg: dict) -> Dict[str, Any]:
     """
     Entry point used by the global pipeline.
@@ -91,6 +188,8 @@ def run(cfg: dict) -> Dict[str, Any]:
         Optional:
           cfg["ndwi"]["scale"] (default 10000.0)
           cfg["ndwi"]["nodata"] (default -9999.0)
+          cfg["ndwi"]["quantize"] (default False): write int16 NDWI with a
+            1e-4 scale instead of float32 (half the bytes on disk and on read)
 
     Returns
     -------
@@ -105,6 +204,7 @@ def run(cfg: dict) -> Dict[str, Any]:
     ndwi_cfg = cfg.get("ndwi", {})
     scale = float(ndwi_cfg.get("scale", 10000.0))
     out_nodata = float(ndwi_cfg.get("nodata", -9999.0))
+    quantize = bool(ndwi_cfg.get("quantize", False))
 
     pairs = _collect_pairs(bands_dir)
     if not pairs:
@@ -113,42 +213,16 @@ def run(cfg: dict) -> Dict[str, Any]:
             "Check that filenames contain a date (YYYY-MM-DD) and band tokens B03/B08."
         )
 
-    outputs: List[str] = []
-    for date in sorted(pairs.keys()):
-        bp = pairs[date]
-
-        # Read B03/B08
-        b03, prof03 = read_tif(bp.b03)
-        b08, prof08 = read_tif(bp.b08)
-
-        # Align B08 to B03 grid
-        if same_grid(prof03, prof08):
-            b08_aligned = b08
-            out_prof = prof03
-        else:
-            b08_aligned = resample_to_match(
-                src_arr=b08,
-                src_profile=prof08,
-                dst_profile=prof03,
-                method="bilinear",
-                out_dtype=np.float32,
-            )
-            out_prof = prof03
-
-        # Compute analytical NDWI (float)
-        ndwi = compute_ndwi(b03, b08_aligned, scale=scale).astype(np.float32)
-
-        # Basic validity mask (Sentinel-2 reflectance should be > 0)
-        valid = (b03 > 0) & (b08_aligned > 0)
-        ndwi_out = ndwi.copy()
-        ndwi_out[~valid] = np.float32(out_nodata)
-
-        # Write output NDWI with your preferred naming style
-        out_fp = out_dir / f"{date}-00_00_{date}-23_59_Sentinel-2_L2A_NDWI.tiff"
-        write_tif(out_fp, ndwi_out, out_prof, dtype="float32", nodata=out_nodata)
-
-        outputs.append(str(out_fp))
-        print(f"[NDWI-Series] {date}: wrote {out_fp.name}")
+    dates = sorted(pairs.keys())
+
+    def _one(date: str) -> str:
+        return _process_date(date, pairs[date], scale, out_nodata, out_dir, quantize)
+
+    # Dates are independent; GDAL reads, warps and writes release the GIL.
+    # Each worker opens its own datasets, so no handle is shared, and runs the
+    # serial NDWI kernel (parallel Numba calls from several threads are unsafe).
+    with gdal_env(), ThreadPoolExecutor(max_workers=min(len(dates), 4)) as ex:
+        outputs: List[str] = list(ex.map(_one, dates))
 
     return {
         "inputs_dir": str(bands_dir),
@@ -156,5 +230,6 @@ def run(cfg: dict) -> Dict[str, Any]:
         "num_dates": len(outputs),
         "outputs": outputs,
         "scale": scale,
-        "nodata": out_nodata,
+        "nodata": NDWI_Q_NODATA if quantize else out_nodata,
+        "quantize": quantize,
     }
\ No newline at end of file
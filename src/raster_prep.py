@@ -9,13 +9,47 @@ records output paths and reference grid metadata for downstream steps.
 
 from __future__ import annotations
 
+import os
+import shutil
 from pathlib import Path
 from typing import Any, Dict
 
-import numpy as np
-import yaml
+from utils_rasterio import (
+    create_tif,
+    gdal_env,
+    open_aligned,
+    read_profile,
+    read_tif,
+    same_grid,
+    tiled_gtiff_options,
+    write_tif,
+)
+from utils_yaml import dump_yaml, load_yaml
 
-from utils_rasterio import read_tif, write_tif, same_grid, resample_to_match
+# Deflate level of the Module A outputs: they are intermediates, decoded once
+# by Module B, so encoding speed matters more than size.
+INTERIM_ZLEVEL = 1
+
+
+def _is_single_band_gtiff(profile: Dict[str, Any]) -> bool:
+    """True if the file can be reused as-is as a single-band GeoTIFF output."""
+    return profile.get("driver") == "GTiff" and profile.get("count") == 1
+
+
+def _link_or_copy(src: str | Path, dst: Path) -> None:
+    """
+    Place an unchanged GeoTIFF at dst: hard link if possible, else file copy.
+
+    Any existing dst is removed first, so a later write to dst can never
+    truncate the (hard-linked) source file.
+    """
+    if dst.exists() and os.path.samefile(src, dst):
+        return
+    dst.unlink(missing_ok=True)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
 
 
 def run(cfg: Dict[str, Any]) -> Dict[str, Any]:
@@ -23,10 +57,11 @@ def run(cfg: Dict[str, Any]) -> Dict[str, Any]:
     Prepare Sentinel-2 bands for downstream NDWI computation.
 
     The function:
-    1) Reads B03 and B08 GeoTIFFs.
+    1) Reads B03 and B08 metadata.
     2) Prints basic metadata (CRS, resolution, shape, dtype).
     3) If grids differ, resamples/reprojects B08 to match the B03 grid.
-    4) Writes preprocessed rasters to disk.
+    4) Writes preprocessed rasters to disk; GeoTIFF bands that need no
+       resampling are hard-linked (or copied) instead of re-encoded.
     5) Returns a dictionary with output paths and reference grid metadata.
 
     Parameters
@@ -54,8 +89,8 @@ def run(cfg: Dict[str, Any]) -> Dict[str, Any]:
 
     res_cont = cfg["processing"].get("resampling_continuous", "bilinear")
 
-    b03, prof03 = read_tif(b03_path)
-    b08, prof08 = read_tif(b08_path)
+    prof03 = read_profile(b03_path)
+    prof08 = read_profile(b08_path)
 
     print(
         "[A] B03:",
@@ -65,7 +100,7 @@ def run(cfg: Dict[str, Any]) -> Dict[str, Any]:
         "shape:",
         (prof03["height"], prof03["width"]),
         "dtype:",
-        b03.dtype,
+        prof03["dtype"],
     )
     print(
         "[A] B08:",
@@ -75,30 +110,46 @@ def run(cfg: Dict[str, Any]) -> Dict[str, Any]:
         "shape:",
         (prof08["height"], prof08["width"]),
         "dtype:",
-        b08.dtype,
+        prof08["dtype"],
     )
 
-    if same_grid(prof03, prof08):
-        b08_aligned = b08
-        print("[A] B08 already aligned. No resampling needed.")
-    else:
-        b08_aligned = resample_to_match(
-            b08, prof08, prof03, method=res_cont, out_dtype=np.float32
-        )
-        print("[A] B08 resampled to match B03 grid.")
-
     # Fixed output filenames for downstream modules.
     b03_out = out_dir / "B03_preprocessed.tif"
     b08_out = out_dir / "B08_preprocessed.tif"
 
-    # Write B03 using its original dtype.
-    write_tif(b03_out, b03, prof03, dtype=str(b03.dtype))
+    # B03 is the reference grid and is never transformed.
+    if _is_single_band_gtiff(prof03):
+        _link_or_copy(b03_path, b03_out)
+    else:
+        b03, _ = read_tif(b03_path)
+        write_tif(
+            b03_out, b03, prof03, dtype=str(b03.dtype),
+            **tiled_gtiff_options(str(b03.dtype), zlevel=INTERIM_ZLEVEL),
+        )
 
-    # If B08 was resampled, write as float32; otherwise keep original dtype.
-    if isinstance(b08_aligned, np.ndarray) and b08_aligned.dtype == np.float32:
-        write_tif(b08_out, b08_aligned, prof03, dtype="float32")
+    if same_grid(prof03, prof08):
+        print("[A] B08 already aligned. No resampling needed.")
+        # Keep original dtype.
+        if _is_single_band_gtiff(prof08):
+            _link_or_copy(b08_path, b08_out)
+        else:
+            b08, _ = read_tif(b08_path)
+            write_tif(
+                b08_out, b08, prof03, dtype=str(b08.dtype),
+                **tiled_gtiff_options(str(b08.dtype), zlevel=INTERIM_ZLEVEL),
+            )
     else:
-        write_tif(b08_out, b08_aligned, prof03, dtype=str(b08.dtype))
+        # Resample on read through a float32 WarpedVRT and write tile by tile,
+        # so the full resampled band is never held in memory.
+        with gdal_env(), open_aligned(
+            b08_path, prof03, method=res_cont, dtype="float32"
+        ) as src08, create_tif(
+            b08_out, prof03, dtype="float32",
+            **tiled_gtiff_options("float32", zlevel=INTERIM_ZLEVEL),
+        ) as dst:
+            for _, window in dst.block_windows(1):
+                dst.write(src08.read(1, window=window), 1, window=window)
+        print("[A] B08 resampled to match B03 grid.")
 
     result = {
         "b03_preprocessed": str(b03_out),
@@ -126,12 +177,12 @@ def main(config_path: str = "config.yaml") -> None:
     config_path:
         Path to the YAML configuration file.
     """
-    cfg = yaml.safe_load(Path(config_path).read_text(encoding="utf-8"))
+    cfg = load_yaml(Path(config_path).read_text(encoding="utf-8"))
     res = run(cfg)
 
     out_dir = Path(cfg["paths"]["out_dir"])
     (out_dir / "a_raster_prep_result.yaml").write_text(
-        yaml.safe_dump(res, sort_keys=False), encoding="utf-8"
+        dump_yaml(res), encoding="utf-8"
     )
     print("[A] Done. Results saved to:", out_dir)
 
@@ -3,20 +3,117 @@ Raster I/O and grid alignment utilities (rasterio-based).
 
 This module provides small helper functions for:
 - reading/writing single-band GeoTIFF rasters,
+- opening rasters for block-wise (windowed) reading and writing,
+- iterating over the blocks of a raster and applying per-block functions,
 - checking whether two rasters share the same grid,
-- resampling/reprojecting a raster to match a reference grid.
+- resampling/reprojecting a raster to match a reference grid (in memory, or
+  file to file in parallel tiles),
+- tiled/compressed GeoTIFF creation options and a tuned GDAL environment.
 
 These utilities are used by Module A (raster preparation) and Module B (flood masking).
 """
 
 from __future__ import annotations
 
+import math
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any, Callable, Iterator
 
 import numpy as np
-import rasterio
-from rasterio.warp import reproject, Resampling
+
+if TYPE_CHECKING:
+    # rasterio loads GDAL on import; it is imported inside the functions that
+    # need it, so profile-only helpers (same_grid, tiled_gtiff_options) and
+    # modules importing them stay cheap to import.
+    import rasterio
+    from rasterio.io import DatasetReader, DatasetWriter
+    from rasterio.vrt import WarpedVRT
+    from rasterio.warp import Resampling
+    from rasterio.windows import Window
+
+
+def gdal_env() -> rasterio.Env:
+    """
+    Return a rasterio/GDAL environment tuned for the raster pipeline.
+
+    The environment enlarges the GDAL block cache (in MB), lets GDAL use all
+    CPUs for (de)compression, and avoids listing sibling files on open. For
+    remote (/vsicurl/) inputs it also enlarges the HTTP range cache and turns
+    on the VSI block cache, so overlapping window reads are not re-fetched.
+
+    read_tif, write_tif and resample_to_match enter it themselves; wrap other
+    raster I/O (e.g. windowed loops over create_tif/open_aligned) in it.
+    Nesting is harmless.
+
+    Returns
+    -------
+    rasterio.Env
+        Environment to be used as a context manager around raster I/O.
+    """
+    import rasterio
+
+    return rasterio.Env(
+        GDAL_CACHEMAX=1024,
+        GDAL_DISABLE_READDIR_ON_OPEN="EMPTY_DIR",
+        GDAL_NUM_THREADS="ALL_CPUS",
+        CPL_VSIL_CURL_CACHE_SIZE=200_000_000,
+        VSI_CACHE=True,
+        VSI_CACHE_SIZE=64_000_000,
+    )
+
+
+def tiled_gtiff_options(
+    dtype: str,
+    blocksize: int = 256,
+    zlevel: int | None = None,
+    predictor: int | None = None,
+) -> dict[str, Any]:
+    """
+    Creation options for a tiled, deflate-compressed GeoTIFF.
+
+    Tiles make random window reads cheap for downstream steps, and the
+    predictor makes deflate much more effective on smooth rasters such as NDWI.
+    By default horizontal differencing (predictor=2) is used for integer data
+    and the floating-point predictor (predictor=3) for float data.
+
+    Parameters
+    ----------
+    dtype:
+        Output data type (e.g., "float32", "uint8").
+    blocksize:
+        Tile width and height in pixels (multiple of 16).
+    zlevel:
+        Optional deflate level (1-9, GDAL default 6). Level 1 encodes several
+        times faster at a slightly larger size, which suits intermediates that
+        are read back once.
+    predictor:
+        Optional GeoTIFF predictor overriding the dtype default (1 = none).
+        Floats computed from few distinct inputs (e.g. NDWI of 8-bit bands)
+        repeat exact values, which deflate compresses better without one.
+
+    Returns
+    -------
+    dict
+        Options to pass as keyword arguments to write_tif/create_tif.
+    """
+    if predictor is None:
+        predictor = 3 if np.issubdtype(np.dtype(dtype), np.floating) else 2
+    options = {
+        "tiled": True,
+        "blockxsize": blocksize,
+        "blockysize": blocksize,
+        "compress": "deflate",
+        "predictor": predictor,
+        "num_threads": "ALL_CPUS",
+        "BIGTIFF": "IF_SAFER",
+    }
+    if zlevel is not None:
+        options["zlevel"] = zlevel
+    return options
 
 
 def read_tif(path: str | Path) -> tuple[np.ndarray, dict[str, Any]]:
@@ -34,19 +131,182 @@ def read_tif(path: str | Path) -> tuple[np.ndarray, dict[str, Any]]:
         array is a 2D NumPy array (H, W) for band 1.
         profile is a rasterio profile dictionary (CRS, transform, dtype, nodata, etc.).
     """
+    import rasterio
+
     path = str(path)
-    with rasterio.open(path) as ds:
+    with gdal_env(), rasterio.open(path) as ds:
         arr = ds.read(1)
         profile = ds.profile.copy()
     return arr, profile
 
 
+def read_tif_blocks(path: str | Path) -> Iterator[tuple[Window, np.ndarray]]:
+    """
+    Iterate over the internal blocks of band 1 of a raster.
+
+    Each block is read on its own, following the file's natural block layout,
+    so memory stays bounded by the block size instead of the raster size.
+
+    Parameters
+    ----------
+    path:
+        Path to the raster file.
+
+    Yields
+    ------
+    (window, array):
+        window is the rasterio Window of the block, array its (h, w) pixels.
+    """
+    import rasterio
+
+    with rasterio.open(str(path)) as ds:
+        for _, window in ds.block_windows(1):
+            yield window, ds.read(1, window=window)
+
+
+def apply_blockwise(
+    src_path: str | Path,
+    dst_path: str | Path,
+    fn: Callable[[np.ndarray], np.ndarray],
+    dtype: str | None = None,
+    nodata: Any | None = None,
+    **creation_options: Any,
+) -> None:
+    """
+    Apply a pixel-wise function to a single-band raster, block by block.
+
+    The output is written on the source grid. Blocks follow the output's tile
+    layout, so every write fills whole tiles and each source window is read
+    once.
+
+    Parameters
+    ----------
+    src_path:
+        Input raster path.
+    dst_path:
+        Output GeoTIFF path.
+    fn:
+        Function mapping a (h, w) block to an output block of the same shape.
+        It must not depend on neighbouring blocks.
+    dtype:
+        Optional output dtype (defaults to the source dtype).
+    nodata:
+        Optional output nodata.
+    **creation_options:
+        GeoTIFF creation options (default: 512 px tiles from tiled_gtiff_options).
+    """
+    import rasterio
+
+    with rasterio.open(str(src_path)) as src:
+        out_dtype = dtype or src.dtypes[0]
+        options = creation_options or tiled_gtiff_options(out_dtype, blocksize=512)
+        with create_tif(dst_path, src.profile, dtype=out_dtype, nodata=nodata, **options) as dst:
+            for _, window in dst.block_windows(1):
+                block = fn(src.read(1, window=window))
+                dst.write(block.astype(out_dtype, copy=False), 1, window=window)
+
+
+def read_profile(path: str | Path) -> dict[str, Any]:
+    """
+    Return the rasterio profile of a raster without reading its pixels.
+
+    Parameters
+    ----------
+    path:
+        Path to the raster file.
+
+    Returns
+    -------
+    dict
+        Rasterio profile dictionary (driver, CRS, transform, dtype, nodata, etc.).
+    """
+    import rasterio
+
+    with rasterio.open(str(path)) as ds:
+        return ds.profile.copy()
+
+
+def _output_profile(
+    ref_profile: dict[str, Any],
+    dtype: str | None = None,
+    nodata: Any | None = None,
+    **creation_options: Any,
+) -> dict[str, Any]:
+    """
+    Build a single-band output profile from a reference profile.
+
+    Parameters
+    ----------
+    ref_profile:
+        Reference rasterio profile that defines the target grid.
+    dtype:
+        Optional dtype override (e.g., "float32", "uint8").
+    nodata:
+        Optional nodata override.
+    **creation_options:
+        Extra GeoTIFF creation options (e.g., from tiled_gtiff_options).
+
+    Returns
+    -------
+    dict
+        Copy of ref_profile with count=1 and the requested overrides applied.
+    """
+    return {
+        **ref_profile,
+        "count": 1,
+        **creation_options,
+        **({} if dtype is None else {"dtype": dtype}),
+        **({} if nodata is None else {"nodata": nodata}),
+    }
+
+
+def create_tif(
+    path: str | Path,
+    ref_profile: dict[str, Any],
+    dtype: str | None = None,
+    nodata: Any | None = None,
+    **creation_options: Any,
+) -> DatasetWriter:
+    """
+    Open a single-band GeoTIFF for writing on the grid defined by ref_profile.
+
+    Use this instead of write_tif when the output is produced block by block;
+    write each block with ``dst.write(block, 1, window=window)``. The caller is
+    responsible for closing the dataset (use it as a context manager).
+
+    Parameters
+    ----------
+    path:
+        Output file path.
+    ref_profile:
+        Reference rasterio profile that defines the target grid.
+    dtype:
+        Optional dtype override (e.g., "float32", "uint8").
+    nodata:
+        Optional nodata override.
+    **creation_options:
+        Extra GeoTIFF creation options (e.g., from tiled_gtiff_options).
+
+    Returns
+    -------
+    rasterio.io.DatasetWriter
+        Open dataset in write mode.
+    """
+    import rasterio
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    profile = _output_profile(ref_profile, dtype, nodata, **creation_options)
+    return rasterio.open(path, "w", **profile)
+
+
 def write_tif(
     path: str | Path,
     arr: np.ndarray,
     ref_profile: dict[str, Any],
     dtype: str | None = None,
     nodata: Any | None = None,
+    **creation_options: Any,
 ) -> None:
     """
     Write a single-band GeoTIFF using a reference profile as the grid contract.
@@ -54,6 +314,10 @@ def write_tif(
     This function uses ref_profile (CRS/transform/width/height) to ensure the output
     matches a reference grid. Use dtype/nodata to override profile values if needed.
 
+    The layout and compression of ref_profile are not inherited: outputs are
+    tiled, compressed, band-interleaved GeoTIFFs (tiled_gtiff_options), unless
+    overridden through creation_options.
+
     Parameters
     ----------
     path:
@@ -66,57 +330,115 @@ def write_tif(
         Optional dtype override (e.g., "float32", "uint8").
     nodata:
         Optional nodata override (e.g., 255 for masks, -9999.0 for float rasters).
+    **creation_options:
+        GeoTIFF creation options, overriding the tiled/compressed defaults.
 
     Raises
     ------
     ValueError
         If arr shape does not match (height, width) defined in ref_profile.
     """
-    path = Path(path)
-    path.parent.mkdir(parents=True, exist_ok=True)
-
     h = int(ref_profile["height"])
     w = int(ref_profile["width"])
     if arr.shape != (h, w):
         raise ValueError(f"Array shape {arr.shape} does not match reference grid {(h, w)}")
 
-    profile = ref_profile.copy()
-    profile.update(count=1)
+    options = {
+        "driver": "GTiff",
+        **tiled_gtiff_options(dtype or ref_profile["dtype"]),
+        "interleave": "band",
+        **creation_options,
+    }
+    with gdal_env(), create_tif(path, ref_profile, dtype=dtype, nodata=nodata, **options) as dst:
+        # Casts and/or makes the array C-contiguous only if needed (no copy otherwise)
+        dst.write(np.ascontiguousarray(arr, dtype=dst.dtypes[0]), 1)
+
 
-    if dtype is not None:
-        profile.update(dtype=dtype)
-    if nodata is not None:
-        profile.update(nodata=nodata)
+def _same_crs(c1: Any, c2: Any) -> bool:
+    """Compare two CRS definitions (CRS objects, EPSG strings, WKT, ...)."""
+    if c1 is None or c2 is None:
+        return c1 is c2
+    if c1 == c2:
+        return True
+    from rasterio.crs import CRS
 
-    with rasterio.open(path, "w", **profile) as dst:
-        dst.write(arr.astype(profile["dtype"]), 1)
+    return CRS.from_user_input(c1) == CRS.from_user_input(c2)
 
 
-def same_grid(p1: dict[str, Any], p2: dict[str, Any]) -> bool:
+def grid_key(profile: dict[str, Any], shape: tuple[int, int] | None = None) -> tuple:
     """
-    Check whether two rasterio profiles share the exact same grid.
+    Hashable key identifying the grid of a profile.
 
-    The grid is considered identical if CRS, affine transform, width, and height
-    are exactly equal.
+    Parameters
+    ----------
+    profile:
+        Rasterio profile dictionary (needs "crs" and "transform").
+    shape:
+        Optional (height, width), e.g. of an array; taken from the profile
+        otherwise.
+
+    Returns
+    -------
+    tuple
+        (CRS string or WKT, a, b, c, d, e, f, height, width). Equal keys mean
+        exactly the same grid; use it for dict lookups and quick equality.
+    """
+    if shape is None:
+        shape = (profile.get("height"), profile.get("width"))
+    crs = profile.get("crs")
+    transform = profile.get("transform")
+    if crs is not None and not isinstance(crs, str):
+        # WKT is cached by rasterio's CRS; str() may run an authority lookup
+        crs = crs.to_wkt()
+    return (
+        crs,
+        *(() if transform is None else tuple(transform)[:6]),
+        *shape,
+    )
+
+
+def same_grid(p1: dict[str, Any], p2: dict[str, Any], tol: float = 1e-6) -> bool:
+    """
+    Check whether two rasterio profiles share the same grid.
+
+    The grid is considered identical if width and height are equal, the CRS are
+    equivalent, and the affine transforms agree to within a tiny fraction of a
+    pixel. Transforms computed along different paths can differ in the last
+    bits; they must not trigger a full resampling.
 
     Parameters
     ----------
     p1, p2:
         Rasterio profile dictionaries.
+    tol:
+        Tolerance on the transform coefficients, as a fraction of the pixel size.
 
     Returns
     -------
     bool
-        True if the grids match exactly; otherwise False.
+        True if the grids match; otherwise False.
     """
-    return (
-        p1.get("crs") == p2.get("crs")
-        and p1.get("transform") == p2.get("transform")
-        and p1.get("width") == p2.get("width")
-        and p1.get("height") == p2.get("height")
+    if p1.get("width") != p2.get("width") or p1.get("height") != p2.get("height"):
+        return False
+    # Identical grids (the common case) compare as plain tuples
+    if grid_key(p1) == grid_key(p2):
+        return True
+    if not _same_crs(p1.get("crs"), p2.get("crs")):
+        return False
+
+    t1, t2 = p1.get("transform"), p2.get("transform")
+    if t1 is None or t2 is None:
+        return t1 is t2
+    abs_tol = tol * max(abs(t1.a), abs(t1.e))
+    return all(
+        math.isclose(x, y, rel_tol=1e-9, abs_tol=abs_tol)
+        for x, y in zip(tuple(t1)[:6], tuple(t2)[:6])
     )
 
 
+_RESAMPLING: dict[str, Resampling] = {}
+
+
 def _resampling(method: str) -> Resampling:
     """
     Map a string name to a rasterio Resampling enum.
@@ -136,12 +458,163 @@ def _resampling(method: str) -> Resampling:
     ValueError
         If method is not supported.
     """
-    method = method.lower().strip()
-    if method == "bilinear":
-        return Resampling.bilinear
-    if method in ("nearest", "near"):
-        return Resampling.nearest
-    raise ValueError(f"Unsupported resampling method: {method}")
+    if not _RESAMPLING:
+        from rasterio.enums import Resampling
+
+        _RESAMPLING.update(
+            bilinear=Resampling.bilinear,
+            nearest=Resampling.nearest,
+            near=Resampling.nearest,
+        )
+    try:
+        return _RESAMPLING[method]
+    except KeyError:
+        pass
+    try:
+        return _RESAMPLING[method.lower().strip()]
+    except KeyError:
+        raise ValueError(f"Unsupported resampling method: {method}") from None
+
+
+def _pixel_offset(
+    src_profile: dict[str, Any],
+    dst_profile: dict[str, Any],
+    tol: float = 1e-6,
+) -> tuple[int, int] | None:
+    """
+    Return the whole-pixel (row, col) offset of dst within src, if it exists.
+
+    This is the case when both grids share CRS and pixel size, are axis-aligned
+    (no rotation), and their origins differ by an integer number of pixels.
+    Resampling then reduces to copying pixels, for bilinear and nearest alike.
+
+    Parameters
+    ----------
+    src_profile, dst_profile:
+        Rasterio profile dictionaries.
+    tol:
+        Tolerance in pixels for the pixel size and origin comparisons.
+
+    Returns
+    -------
+    tuple[int, int] | None
+        (row_off, col_off) of the destination origin in source pixels, or None
+        if the grids are not related by a whole-pixel shift.
+    """
+    if src_profile.get("crs") != dst_profile.get("crs"):
+        return None
+
+    st = src_profile["transform"]
+    dt = dst_profile["transform"]
+    if st.b != 0 or st.d != 0 or dt.b != 0 or dt.d != 0:
+        return None
+    if abs(dt.a - st.a) > tol * abs(st.a) or abs(dt.e - st.e) > tol * abs(st.e):
+        return None
+
+    col = (dt.c - st.c) / st.a
+    row = (dt.f - st.f) / st.e
+    if abs(col - round(col)) > tol or abs(row - round(row)) > tol:
+        return None
+    return int(round(row)), int(round(col))
+
+
+# Nearest-neighbour index LUTs, keyed on (source grid, destination grid).
+# Each LUT holds one integer per destination pixel, so only a few are kept.
+_NEAREST_LUT_CACHE: dict[tuple, np.ndarray] = {}
+_NEAREST_LUT_CACHE_SIZE = 4
+
+
+def build_nearest_lut(
+    src_shape: tuple[int, int],
+    src_profile: dict[str, Any],
+    dst_profile: dict[str, Any],
+) -> np.ndarray:
+    """
+    Flat source-pixel index of every destination pixel, for nearest resampling.
+
+    The LUT is obtained by warping a raster of pixel indices once with nearest
+    resampling; destination pixels outside the source get -1. LUTs are cached
+    per (source grid, destination grid), so repeated nearest warps between the
+    same grids reduce to a gather (apply_nearest_lut).
+
+    Parameters
+    ----------
+    src_shape:
+        (height, width) of the source array.
+    src_profile, dst_profile:
+        Rasterio profiles of the source and destination grids.
+
+    Returns
+    -------
+    np.ndarray
+        Read-only (dst_height, dst_width) integer array of flat source indices.
+    """
+    from rasterio.enums import Resampling
+    from rasterio.warp import reproject
+
+    dst_shape = (int(dst_profile["height"]), int(dst_profile["width"]))
+    key = (grid_key(src_profile, src_shape), grid_key(dst_profile, dst_shape))
+    lut = _NEAREST_LUT_CACHE.get(key)
+    if lut is not None:
+        return lut
+
+    n = src_shape[0] * src_shape[1]
+    dtype = np.int32 if n < np.iinfo(np.int32).max else np.int64
+    index = np.arange(n, dtype=dtype).reshape(src_shape)
+    lut = np.empty(dst_shape, dtype=dtype)
+    with gdal_env():
+        reproject(
+            source=index,
+            destination=lut,
+            src_transform=src_profile["transform"],
+            src_crs=src_profile["crs"],
+            dst_transform=dst_profile["transform"],
+            dst_crs=dst_profile["crs"],
+            resampling=Resampling.nearest,
+            src_nodata=-1,
+            dst_nodata=-1,
+            num_threads=os.cpu_count() or 1,
+        )
+    lut.flags.writeable = False
+
+    if len(_NEAREST_LUT_CACHE) >= _NEAREST_LUT_CACHE_SIZE:
+        _NEAREST_LUT_CACHE.pop(next(iter(_NEAREST_LUT_CACHE)))
+    _NEAREST_LUT_CACHE[key] = lut
+    return lut
+
+
+def apply_nearest_lut(
+    src_arr: np.ndarray,
+    lut: np.ndarray,
+    out: np.ndarray | None = None,
+) -> np.ndarray:
+    """
+    Nearest-resample src_arr with a LUT from build_nearest_lut.
+
+    Destination pixels outside the source are set to 0, as with the GDAL warp.
+
+    Parameters
+    ----------
+    src_arr:
+        Source raster array (2D), on the grid the LUT was built for.
+    lut:
+        Flat source index per destination pixel (-1 outside the source).
+    out:
+        Optional preallocated array with the LUT's shape.
+
+    Returns
+    -------
+    np.ndarray
+        Resampled array (out itself when given).
+    """
+    outside = lut < 0
+    values = src_arr.ravel()[np.where(outside, 0, lut)]
+    if out is None:
+        out = values
+    else:
+        out[...] = values
+    np.putmask(out, outside, 0)
+    return out
 
 
 def resample_to_match(
@@ -149,7 +622,12 @@ def resample_to_match(
     src_profile: dict[str, Any],
     dst_profile: dict[str, Any],
     method: str = "bilinear",
-    out_dtype: Any = np.float32,
+    out_dtype: Any = None,
+    out: np.ndarray | None = None,
+    num_threads: int | None = None,
+    warp_mem_limit: int = 512,
+    tolerance: float = 0.125,
+    reuse_index: bool = False,
 ) -> np.ndarray:
     """
     Reproject/resample a source raster to match a destination grid exactly.
@@ -157,6 +635,11 @@ def resample_to_match(
     The destination grid is defined by dst_profile["crs"], dst_profile["transform"],
     dst_profile["width"], and dst_profile["height"].
 
+    If the destination is the source grid shifted by a whole number of pixels
+    (same CRS and pixel size, no rotation), pixels are copied by slicing instead
+    of warping; destination pixels outside the source are set to 0, as with the
+    GDAL warp.
+
     Parameters
     ----------
     src_arr:
@@ -168,22 +651,325 @@ def resample_to_match(
     method:
         Resampling method: "bilinear" (continuous rasters) or "nearest" (masks/classes).
     out_dtype:
-        Output NumPy dtype.
+        Output NumPy dtype (ignored when out is given). Defaults to the source
+        dtype for "nearest", which only copies values, and float32 otherwise.
+    out:
+        Optional preallocated (dst_height, dst_width) array to write into, e.g. a
+        slice of a larger stack; its dtype is used as the output dtype.
+    num_threads:
+        Number of GDAL warper threads (default: all CPUs).
+    warp_mem_limit:
+        Working memory of the GDAL warper, in MB.
+    tolerance:
+        Maximum error, in pixels, of GDAL's approximate transformer, which
+        projects a few points per scanline and interpolates between them;
+        0 forces an exact projection of every pixel.
+    reuse_index:
+        For "nearest" only: resample through a cached pixel-index LUT
+        (build_nearest_lut), so repeated warps between the same grids cost a
+        gather instead of a warp each.
 
     Returns
     -------
     np.ndarray
-        Reprojected/resampled array with shape (dst_height, dst_width).
-    """
-    dst = np.empty((dst_profile["height"], dst_profile["width"]), dtype=out_dtype)
-
-    reproject(
-        source=src_arr,
-        destination=dst,
-        src_transform=src_profile["transform"],
-        src_crs=src_profile["crs"],
-        dst_transform=dst_profile["transform"],
-        dst_crs=dst_profile["crs"],
-        resampling=_resampling(method),
-    )
-    return dst
\ No newline at end of file
+        Reprojected/resampled array with shape (dst_height, dst_width)
+        (out itself when given).
+
+    Raises
+    ------
+    ValueError
+        If out does not have shape (dst_height, dst_width).
+    """
+    from rasterio.warp import reproject
+
+    dst_h, dst_w = int(dst_profile["height"]), int(dst_profile["width"])
+    if out is None:
+        if out_dtype is None:
+            out_dtype = src_arr.dtype if _resampling(method).name == "nearest" else np.float32
+        dst = np.empty((dst_h, dst_w), dtype=out_dtype)
+    elif out.shape != (dst_h, dst_w):
+        raise ValueError(f"Output shape {out.shape} does not match destination grid {(dst_h, dst_w)}")
+    else:
+        dst = out
+
+    offset = _pixel_offset(src_profile, dst_profile)
+    if offset is not None:
+        row_off, col_off = offset
+        src_h, src_w = src_arr.shape
+        dst.fill(0)
+        r0, r1 = max(row_off, 0), min(row_off + dst_h, src_h)
+        c0, c1 = max(col_off, 0), min(col_off + dst_w, src_w)
+        if r0 < r1 and c0 < c1:
+            dst[r0 - row_off:r1 - row_off, c0 - col_off:c1 - col_off] = src_arr[r0:r1, c0:c1]
+        return dst
+
+    if reuse_index and _resampling(method).name == "nearest":
+        lut = build_nearest_lut(src_arr.shape, src_profile, dst_profile)
+        return apply_nearest_lut(src_arr, lut, out=dst)
+
+    with gdal_env():
+        reproject(
+            # GDAL needs a C-contiguous buffer; otherwise rasterio copies it anyway
+            source=np.ascontiguousarray(src_arr),
+            destination=dst,
+            src_transform=src_profile["transform"],
+            src_crs=src_profile["crs"],
+            dst_transform=dst_profile["transform"],
+            dst_crs=dst_profile["crs"],
+            resampling=_resampling(method),
+            num_threads=num_threads or os.cpu_count() or 1,
+            warp_mem_limit=warp_mem_limit,
+            tolerance=tolerance,
+        )
+    return dst
+
+
+def resample_many_to_match(
+    arrays: list[np.ndarray],
+    src_profile: dict[str, Any],
+    dst_profile: dict[str, Any],
+    methods: str | list[str] = "bilinear",
+    num_threads: int | None = None,
+    warp_mem_limit: int = 512,
+) -> list[np.ndarray]:
+    """
+    Resample several rasters sharing one source grid onto a destination grid.
+
+    Arrays using the same resampling method are stacked into one (bands, H, W)
+    array and warped by a single reproject call, so GDAL sets up the
+    transformer and warp chunks once per method instead of once per array.
+
+    Parameters
+    ----------
+    arrays:
+        2D source arrays, all with the same shape (the source grid).
+    src_profile:
+        Rasterio profile of the source grid.
+    dst_profile:
+        Rasterio profile defining the target grid.
+    methods:
+        One resampling method for all arrays, or one per array.
+    num_threads:
+        Number of GDAL warper threads (default: all CPUs).
+    warp_mem_limit:
+        Working memory of the GDAL warper, in MB.
+
+    Returns
+    -------
+    list[np.ndarray]
+        Resampled (dst_height, dst_width) arrays, in input order; dtypes follow
+        resample_to_match (source dtype for "nearest", float32 otherwise).
+
+    Raises
+    ------
+    ValueError
+        If the arrays do not share a shape or methods has the wrong length.
+    """
+    from rasterio.warp import reproject
+
+    if isinstance(methods, str):
+        methods = [methods] * len(arrays)
+    if len(methods) != len(arrays):
+        raise ValueError(f"Got {len(methods)} methods for {len(arrays)} arrays")
+    if len({a.shape for a in arrays}) > 1:
+        raise ValueError("All source arrays must share the same shape")
+
+    dst_h, dst_w = int(dst_profile["height"]), int(dst_profile["width"])
+    results: list[np.ndarray | None] = [None] * len(arrays)
+
+    groups: dict[Any, list[int]] = {}
+    for i, method in enumerate(methods):
+        groups.setdefault(_resampling(method), []).append(i)
+
+    for resampling, idx in groups.items():
+        # Whole-pixel shifts and single arrays gain nothing from stacking
+        if len(idx) == 1 or _pixel_offset(src_profile, dst_profile) is not None:
+            for i in idx:
+                results[i] = resample_to_match(
+                    arrays[i], src_profile, dst_profile, method=methods[i],
+                    num_threads=num_threads, warp_mem_limit=warp_mem_limit,
+                )
+            continue
+
+        if resampling.name == "nearest":
+            dtype = np.result_type(*(arrays[i].dtype for i in idx))
+        else:
+            dtype = np.float32
+        src = np.stack([arrays[i] for i in idx]).astype(dtype, copy=False)
+        dst = np.empty((len(idx), dst_h, dst_w), dtype=dtype)
+        with gdal_env():
+            reproject(
+                source=src,
+                destination=dst,
+                src_transform=src_profile["transform"],
+                src_crs=src_profile["crs"],
+                dst_transform=dst_profile["transform"],
+                dst_crs=dst_profile["crs"],
+                resampling=resampling,
+                num_threads=num_threads or os.cpu_count() or 1,
+                warp_mem_limit=warp_mem_limit,
+            )
+        for band, i in enumerate(idx):
+            results[i] = dst[band].astype(
+                arrays[i].dtype if resampling.name == "nearest" else np.float32, copy=False
+            )
+
+    return results
+
+
+def resample_to_match_tiled(
+    src_path: str | Path,
+    dst_path: str | Path,
+    dst_profile: dict[str, Any],
+    method: str = "bilinear",
+    dtype: str | None = None,
+    nodata: Any | None = None,
+    chunk: int = 2048,
+    pad: int = 2,
+    max_workers: int | None = None,
+    **creation_options: Any,
+) -> None:
+    """
+    Resample a raster file onto a destination grid, tile by tile and in parallel.
+
+    The destination grid is split into chunk x chunk tiles. For each tile, the
+    tile bounds are projected into the source CRS to find the source window
+    (plus pad pixels for the interpolation kernel); only that window is read
+    and resampled with resample_to_match. Tiles run in a thread pool (GDAL
+    releases the GIL) and writes are serialized, so memory stays bounded by a
+    few tiles whatever the raster size.
+
+    When the destination is the source shifted by whole pixels, the result is
+    identical to resample_to_match on the full raster. On reprojected grids it
+    can differ slightly from a single full warp: GDAL scales its resampling
+    kernel per warp chunk, so tile boundaries change the interpolation weights
+    of a few pixels.
+
+    Parameters
+    ----------
+    src_path:
+        Input raster path (band 1 is resampled).
+    dst_path:
+        Output GeoTIFF path.
+    dst_profile:
+        Rasterio profile defining the target grid (north-up).
+    method:
+        Resampling method: "bilinear" (continuous rasters) or "nearest" (masks/classes).
+    dtype:
+        Optional output dtype (default: source dtype for "nearest", float32 otherwise).
+    nodata:
+        Optional output nodata.
+    chunk:
+        Tile width and height in destination pixels.
+    pad:
+        Extra source pixels read around each tile window.
+    max_workers:
+        Number of worker threads (default: number of CPUs).
+    **creation_options:
+        GeoTIFF creation options (default: 512 px tiles from tiled_gtiff_options).
+    """
+    import rasterio
+    from rasterio.warp import transform_bounds
+    from rasterio.windows import Window, from_bounds
+    from rasterio.windows import bounds as window_bounds
+    from rasterio.windows import transform as window_transform
+
+    src_profile = read_profile(src_path)
+    if dtype is None:
+        dtype = src_profile["dtype"] if _resampling(method).name == "nearest" else "float32"
+    options = creation_options or tiled_gtiff_options(dtype, blocksize=512)
+
+    dst_h, dst_w = int(dst_profile["height"]), int(dst_profile["width"])
+    dst_transform = dst_profile["transform"]
+    tiles = [
+        Window(c, r, min(chunk, dst_w - c), min(chunk, dst_h - r))
+        for r in range(0, dst_h, chunk)
+        for c in range(0, dst_w, chunk)
+    ]
+    lock = threading.Lock()
+
+    with gdal_env(), create_tif(dst_path, dst_profile, dtype=dtype, nodata=nodata, **options) as dst:
+
+        def _one(tile: Window) -> None:
+            h, w = int(tile.height), int(tile.width)
+            block = np.zeros((h, w), dtype=dtype)
+            tile_profile = {
+                "crs": dst_profile["crs"],
+                "transform": window_transform(tile, dst_transform),
+                "width": w,
+                "height": h,
+            }
+            # Each worker opens its own handle; datasets are not thread-safe
+            with rasterio.open(str(src_path)) as src:
+                bounds = transform_bounds(
+                    dst_profile["crs"], src.crs, *window_bounds(tile, dst_transform), densify_pts=21
+                )
+                win = from_bounds(*bounds, transform=src.transform)
+                c0 = max(math.floor(win.col_off) - pad, 0)
+                r0 = max(math.floor(win.row_off) - pad, 0)
+                c1 = min(math.ceil(win.col_off + win.width) + pad, src.width)
+                r1 = min(math.ceil(win.row_off + win.height) + pad, src.height)
+                if c0 < c1 and r0 < r1:
+                    src_win = Window(c0, r0, c1 - c0, r1 - r0)
+                    arr = src.read(1, window=src_win)
+                    src_tile = {"crs": src.crs, "transform": src.window_transform(src_win)}
+                    # Tiles already run in parallel: one warper thread each
+                    resample_to_match(arr, src_tile, tile_profile, method=method, out=block, num_threads=1)
+            with lock:
+                dst.write(block, 1, window=tile)
+
+        workers = max_workers or min(len(tiles), os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=workers) as ex:
+            # list() propagates worker exceptions
+            list(ex.map(_one, tiles))
+
+
+@contextmanager
+def open_aligned(
+    path: str | Path,
+    ref_profile: dict[str, Any],
+    method: str = "bilinear",
+    dtype: str | None = None,
+) -> Iterator[DatasetReader | WarpedVRT]:
+    """
+    Open a raster so that windowed reads follow the reference grid.
+
+    If the raster already shares the reference grid it is returned as-is;
+    otherwise it is wrapped in a WarpedVRT that resamples on the fly, so a
+    window of the reference grid can be read without warping the full raster.
+
+    Parameters
+    ----------
+    path:
+        Path to the raster file.
+    ref_profile:
+        Rasterio profile defining the target grid.
+    method:
+        Resampling method: "bilinear" (continuous rasters) or "nearest" (masks/classes).
+    dtype:
+        Optional working/output dtype of the WarpedVRT (e.g. "float32", so
+        bilinear values of integer bands are not rounded). Ignored when the
+        raster is returned as-is.
+
+    Yields
+    ------
+    rasterio.io.DatasetReader or rasterio.vrt.WarpedVRT
+        Dataset whose band 1 is aligned with the reference grid.
+    """
+    import rasterio
+    from rasterio.vrt import WarpedVRT
+
+    with rasterio.open(str(path)) as src:
+        if same_grid(ref_profile, src.profile):
+            yield src
+            return
+        with WarpedVRT(
+            src,
+            crs=ref_profile["crs"],
+            transform=ref_profile["transform"],
+            width=ref_profile["width"],
+            height=ref_profile["height"],
+            resampling=_resampling(method),
+            dtype=dtype,
+        ) as vrt:
+            yield vrt
@@ -0,0 +1,53 @@
+"""
+YAML helpers shared by the raster pipeline modules.
+
+Configs and result artifacts are read and written with PyYAML's libyaml
+bindings (CSafeLoader/CSafeDumper) when available, which are several times
+faster than the pure-Python safe loader/dumper; otherwise the pure-Python
+classes are used. Both produce the same documents.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+import yaml
+
+try:
+    from yaml import CSafeDumper as _Dumper, CSafeLoader as _Loader
+except ImportError:
+    from yaml import SafeDumper as _Dumper, SafeLoader as _Loader
+
+
+def load_yaml(text: str) -> Any:
+    """
+    Parse a YAML document (safe subset).
+
+    Parameters
+    ----------
+    text : str
+        YAML text.
+
+    Returns
+    -------
+    Any
+        Parsed Python object.
+    """
+    return yaml.load(text, Loader=_Loader)
+
+
+def dump_yaml(obj: Any) -> str:
+    """
+    Serialize an object to YAML (safe subset), keeping dict insertion order.
+
+    Parameters
+    ----------
+    obj : Any
+        Object made of plain Python types (dict, list, str, numbers, ...).
+
+    Returns
+    -------
+    str
+        YAML text.
+    """
+    return yaml.dump(obj, Dumper=_Dumper, sort_keys=False)
@@ -18,7 +18,7 @@ def test_count_invalid_geometries_runs():
     """
     Test that invalid geometry counting runs and returns a non-negative integer.
     """
-    buildings = read_buildings().head(1000)
+    buildings = read_buildings(limit=1000)
     invalid = count_invalid_geometries(buildings)
 
     import numbers
@@ -33,7 +33,7 @@ def test_fix_invalid_geometries_preserves_feature_count():
     Geometry fixing should correct invalid shapes but preserve
     the number of features.
     """
-    buildings = read_buildings().head(1000)
+    buildings = read_buildings(limit=1000)
     fixed = fix_invalid_geometries(buildings)
 
     assert len(fixed) == len(buildings)
\ No newline at end of file
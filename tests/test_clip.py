@@ -17,7 +17,7 @@ def test_clip_to_aoi_reduces_or_preserves_feature_count():
     Test that clipping to the AOI does not increase the number
     of vector features.
     """
-    buildings = read_buildings().head(1000)
+    buildings = read_buildings(limit=1000)
     aoi = aoi_from_raster(AOI_RASTER)
 
     clipped = clip_to_aoi(buildings, aoi)
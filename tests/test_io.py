@@ -0,0 +1,46 @@
+"""
+Tests for the FlatGeobuf cache of the administrative units.
+
+The cache is built from a small synthetic geopackage, so these tests do
+not need the GADM dataset. Reading the cache must give the same frame
+as reading the geopackage, in the same row order.
+"""
+
+import geopandas as gpd
+import pandas as pd
+from shapely.geometry import box
+
+from flood_project.vector import io
+
+
+def _write_admin_gpkg(path):
+    """Write 50 unit squares in scattered order (not Hilbert order)."""
+    cells = [((7 * i) % 10, (3 * i) % 5) for i in range(50)]
+    admin = gpd.GeoDataFrame(
+        {"GID_3": [f"U{i:02d}" for i in range(50)]},
+        geometry=[box(x, y, x + 1, y + 1) for x, y in cells],
+        crs="EPSG:4326",
+    )
+    admin.to_file(path, layer="ADM_ADM_3", driver="GPKG", engine="pyogrio")
+
+
+def test_admin_cache_reads_match_geopackage(tmp_path, monkeypatch):
+    """Cached reads keep geopackage order, with and without an AOI."""
+    gpkg = tmp_path / "admin.gpkg"
+    _write_admin_gpkg(gpkg)
+    monkeypatch.setattr(io, "ADMIN_GPKG", gpkg)
+    monkeypatch.setattr(io, "ADMIN_LAYER", "ADM_ADM_3")
+    monkeypatch.setattr(io, "ADMIN_CACHE", tmp_path / "admin_ADM_ADM_3.fgb")
+
+    aoi = gpd.GeoDataFrame(geometry=[box(2.5, 1.5, 6.5, 3.5)], crs="EPSG:4326")
+    from_gpkg = [io.read_admin_units(), io.read_admin_units(aoi)]
+
+    assert io.cache_admin_units() == io.ADMIN_CACHE
+    from_cache = [io.read_admin_units(), io.read_admin_units(aoi)]
+
+    for expected, got in zip(from_gpkg, from_cache):
+        assert 0 < len(got) <= 50
+        pd.testing.assert_frame_equal(
+            got.drop(columns="geometry"), expected.drop(columns="geometry")
+        )
+        assert got.geometry.geom_equals(expected.geometry).all()
@@ -5,10 +5,17 @@ These tests validate that spatial functions such as CRS harmonization
 and administrative unit assignment operate correctly on vector data.
 """
 
+import geopandas as gpd
+import pandas as pd
+import pytest
+import shapely
+from shapely.geometry import box
+
 from flood_project.vector.io import read_buildings, read_admin_units
 from flood_project.vector.spatial import (
     ensure_same_crs,
     assign_admin_id,
+    clip_to_aoi,
 )
 
 
@@ -16,7 +23,7 @@ def test_ensure_same_crs_applies_target_crs():
     """
     Test that ensure_same_crs reprojects a GeoDataFrame when needed.
     """
-    buildings = read_buildings().head(500)
+    buildings = read_buildings(limit=500)
     admin = read_admin_units()
 
     reprojected = ensure_same_crs(buildings, admin.crs)
@@ -29,10 +36,98 @@ def test_assign_admin_id_creates_column():
     Test that a spatial join assigns an administrative ID column
     to the buildings GeoDataFrame.
     """
-    buildings = read_buildings().head(500)
+    buildings = read_buildings(limit=500)
     admin = read_admin_units()
 
     buildings = ensure_same_crs(buildings, admin.crs)
     joined = assign_admin_id(buildings, admin)
 
-    assert "admin_id" in joined.columns
\ No newline at end of file
+    assert "admin_id" in joined.columns
+
+
+def _synthetic_frames():
+    """
+    Two adjacent admin units sharing the edge x=10, and three buildings:
+    one crossing the edge (mostly in B), one whose representative point
+    lies exactly on the edge, and one outside both units.
+    """
+    admin = gpd.GeoDataFrame(
+        {"GID_3": ["A", "B"]},
+        geometry=[box(0, 0, 10, 10), box(10, 0, 20, 10)],
+        crs="EPSG:32634",
+    )
+    buildings = gpd.GeoDataFrame(
+        {"name": ["crossing", "on_edge", "outside"]},
+        geometry=[box(9, 2, 15, 4), box(9, 5, 11, 7), box(30, 30, 31, 31)],
+        index=[10, 11, 12],
+        crs="EPSG:32634",
+    )
+    return buildings, admin
+
+
+def test_assign_admin_id_boundary_cases():
+    """
+    Test assign_admin_id on in-memory data: a building crossing a unit
+    boundary goes to the unit holding its representative point, a point
+    on a shared edge takes the first unit, and a building outside every
+    unit gets a missing id. Input rows and index are kept.
+    """
+    buildings, admin = _synthetic_frames()
+
+    joined = assign_admin_id(buildings, admin)
+
+    assert list(joined.index) == [10, 11, 12]
+    assert joined.loc[10, "admin_id"] == "B"
+    assert joined.loc[11, "admin_id"] == "A"
+    assert pd.isna(joined.loc[12, "admin_id"])
+
+
+def test_assign_admin_id_shared_edge_follows_admin_order():
+    """
+    Test that for a point on a shared edge the first unit in
+    admin_units order wins, whatever that order is.
+    """
+    buildings, admin = _synthetic_frames()
+
+    joined = assign_admin_id(buildings, admin.iloc[::-1])
+
+    assert joined.loc[11, "admin_id"] == "B"
+
+
+def test_duckdb_clip_and_assign_matches_geopandas():
+    """
+    Test that the DuckDB backend gives the same rows, order, geometries
+    and admin ids as clip_to_aoi followed by assign_admin_id. Skipped
+    when duckdb or its spatial extension is not installed.
+    """
+    pytest.importorskip("duckdb")
+    from flood_project.vector.spatial_duckdb import _connect, clip_and_assign
+
+    try:
+        _connect().close()
+    except ImportError as exc:
+        pytest.skip(str(exc))
+
+    buildings, admin = _synthetic_frames()
+    extra = gpd.GeoDataFrame(
+        {"name": ["clipped", "no_unit", "inside"]},
+        geometry=[box(14, 6, 18, 8), box(2, 10.5, 3, 11.5), box(1, 1, 2, 2)],
+        index=[13, 14, 15],
+        crs=buildings.crs,
+    )
+    buildings = pd.concat([buildings, extra])
+    aoi = gpd.GeoDataFrame(geometry=[box(0, 0, 16, 12)], crs=buildings.crs)
+
+    expected = assign_admin_id(clip_to_aoi(buildings, aoi), admin)
+    result = clip_and_assign(buildings, admin, aoi)
+
+    assert list(result.index) == list(expected.index)
+    assert list(result["name"]) == list(expected["name"])
+    pd.testing.assert_series_equal(
+        result["admin_id"].astype(object),
+        expected["admin_id"].astype(object),
+    )
+    assert shapely.equals(
+        shapely.normalize(result.geometry.values),
+        shapely.normalize(expected.geometry.values),
+    ).all()